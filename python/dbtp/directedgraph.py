@@ -1,15 +1,60 @@
-from typing import Iterable, Optional, Any, List, Protocol
+from typing import Iterable, Iterator, Mapping, Optional, Any, List, Protocol, TypeVar
 
 from .graph import Graph, Vertex, Edge
-import math
+from collections import Counter
+from types import MappingProxyType
+import cmath
+import heapq
+
+_TIKZ_HEADER = "\\begin{tikzpicture}[->,>=Stealth,shorten >=1pt,auto,node distance=3cm, thick,main node/.style={circle,draw,font=\\sffamily\\Large\\bfseries}]\n"
+_TIKZ_FOOTER = "\\end{tikzpicture}\n"
 
 class CyclicGraphError(Exception):
     """Exception raised when a cycle is detected in the directed graph."""
     pass
 
+_T = TypeVar("_T")
+
+class _DenseView(Mapping[int, _T]):
+    """Read-only mapping over a list, keyed by list index."""
+
+    __slots__ = ("_items",)
+
+    def __init__(self, items: list[_T]):
+        self._items = items
+
+    def __getitem__(self, key: int) -> _T:
+        if type(key) is not int or not 0 <= key < len(self._items):
+            raise KeyError(key)
+        return self._items[key]
+
+    def __contains__(self, key: object) -> bool:
+        return type(key) is int and 0 <= key < len(self._items)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(len(self._items)))
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __repr__(self) -> str:
+        return repr(dict(enumerate(self._items)))
+
 class DirectedGraph(Graph):
     """
-    Directed graph with adjacency stored as a dict of lists.
+    Directed graph with adjacency stored as a dict of insertion-ordered
+    dicts, mapping each target vertex id to None.
+
+    Graphs built in bulk with vertex ids 0..n-1 are stored densely, in lists
+    indexed by vertex id. The public `vertices` and `adjacency` are read-only
+    mappings keyed by vertex id in both storages, reading them leaves the
+    storage unchanged.
+
+    Every edit through the methods bumps `_stamp`, the topological order is
+    cached until the next edit. Edit the graph only through its methods. The
+    cache also checks the edge count, so an edge added or removed by hand in
+    both `edges` and the target dicts of `adjacency` is noticed, but a change
+    to `adjacency` alone is not.
     """
 
     def __init__(
@@ -20,9 +65,12 @@ class DirectedGraph(Graph):
 
         super().__init__()
 
-        self.vertices: dict[int, Vertex] = {}
+        self._vertices: dict[int, Vertex] | list[Vertex] = {}
         self.edges: dict[tuple[int, int], Edge] = {}
-        self.adjacency: dict[int, List[int]] = {}
+        self._adjacency: dict[int, dict[int, None]] | list[dict[int, None]] = {}
+        self._dense: bool = False
+        self._stamp: int = 0
+        self._topo_cache: Optional[tuple[tuple[int, int], Optional[list[int]]]] = None
         
         if vertices:
             for v in vertices:
@@ -32,15 +80,82 @@ class DirectedGraph(Graph):
             for e in edges:    
                 self.add_edge(e)
 
+    @classmethod
+    def _from_known_unique(
+        cls,
+        vertices: Iterable[Vertex],
+        edges: Iterable[Edge] = ()
+    ) -> 'DirectedGraph':
+        """
+        Build a graph in bulk, skipping the validation done by add_vertex and add_edge.
+        The caller guarantees that vertex ids and edges are unique and that every
+        edge connects existing vertices.
+        """
+        g = cls.__new__(cls)
+        Graph.__init__(g)
+        vertices = list(vertices)
+        g._dense = all(v.id == i for i, v in enumerate(vertices))
+        if g._dense:
+            g._vertices = vertices
+            g._adjacency = [{} for _ in vertices]
+        else:
+            g._vertices = {v.id: v for v in vertices}
+            g._adjacency = {vid: {} for vid in g._vertices}
+        g.edges = {}
+        g._stamp = 0
+        g._topo_cache = None
+        for e in edges:
+            g.edges[(e.source, e.target)] = e
+            g._adjacency[e.source][e.target] = None
+        return g
+
+    @property
+    def vertices(self) -> Mapping[int, Vertex]:
+        """Read-only view of the vertices keyed by id."""
+        if self._dense:
+            return _DenseView(self._vertices)
+        return MappingProxyType(self._vertices)
+
+    @property
+    def adjacency(self) -> Mapping[int, dict[int, None]]:
+        """Read-only view of the targets of each vertex keyed by source id, as insertion-ordered dicts."""
+        if self._dense:
+            return _DenseView(self._adjacency)
+        return MappingProxyType(self._adjacency)
+
+    def _vertex_ids(self) -> Iterable[int]:
+        """Return the vertex ids in insertion order."""
+        return range(len(self._vertices)) if self._dense else self._vertices.keys()
+
+    def _vertex_items(self) -> Iterable[tuple[int, Vertex]]:
+        """Return (id, vertex) pairs in insertion order."""
+        return enumerate(self._vertices) if self._dense else self._vertices.items()
+
+    def _adjacency_items(self) -> Iterable[tuple[int, dict[int, None]]]:
+        """Return (id, targets) pairs in insertion order."""
+        return enumerate(self._adjacency) if self._dense else self._adjacency.items()
+
+    def _has_vertex_id(self, vid: int) -> bool:
+        if self._dense:
+            return 0 <= vid < len(self._vertices)
+        return vid in self._vertices
+
+    def _to_sparse(self):
+        """Switch a densely stored graph to dict storage."""
+        self._vertices = dict(enumerate(self._vertices))
+        self._adjacency = dict(enumerate(self._adjacency))
+        self._dense = False
+
     def __str__(self) -> str:
         # Generate a list of the edges in string format
-        edges = ""
-        for (source, target), e in self.edges.items():
+        vertices = self._vertices
+        lines = []
+        for e in self.edges.values():
             if e.label is not None:
-                edges += f"{self.vertices[source]} -[{e.label}]-> {self.vertices[target]}\n"
+                lines.append(f"{vertices[e.source]} -[{e.label}]-> {vertices[e.target]}\n")
             else:
-                edges += f"{self.vertices[source]} -> {self.vertices[target]}\n"
-        return edges
+                lines.append(f"{vertices[e.source]} -> {vertices[e.target]}\n")
+        return "".join(lines)
     
     def latex(
         self,
@@ -52,58 +167,97 @@ class DirectedGraph(Graph):
         Args:
             radius: Radius of the circle on which nodes are arranged (default: 3.0)
         """
-        latex_str = "\\begin{tikzpicture}[->,>=Stealth,shorten >=1pt,auto,node distance=3cm, thick,main node/.style={circle,draw,font=\\sffamily\\Large\\bfseries}]\n"
+        parts = [_TIKZ_HEADER]
         
-        # Add vertices arranged on a circle
-        num_vertices = len(self.vertices)
-        for i, v in enumerate(sorted(self.vertices.values(), key=lambda v: v.id)):
-            angle = 360 * i / num_vertices
-            x = radius * math.cos(math.radians(angle))
-            y = radius * math.sin(math.radians(angle))
-            latex_str += f"\\node[main node] ({v.id}) at ({x:.2f},{y:.2f}) {{$ {v} $}};\n"
+        # Add vertices arranged on a circle, positions are the n-th roots of unity scaled by radius
+        num_vertices = len(self._vertices)
+        coords = [radius * cmath.exp(2j * cmath.pi * i / num_vertices) for i in range(num_vertices)]
+        for i, v in enumerate(sorted((v for _, v in self._vertex_items()), key=lambda v: v.id)):
+            c = coords[i]
+            parts.append(f"\\node[main node] ({v.id}) at ({c.real:.2f},{c.imag:.2f}) {{$ {v} $}};\n")
         
         # Add edges
-        for (source, target), e in self.edges.items():
+        for e in self.edges.values():
             label_str = f"[{e.label}]" if e.label is not None else ""
-            latex_str += f"\\path ({source}) edge {label_str} ({target});\n"
+            parts.append(f"\\path ({e.source}) edge {label_str} ({e.target});\n")
         
-        latex_str += "\\end{tikzpicture}\n"
-        return latex_str
+        parts.append(_TIKZ_FOOTER)
+        return "".join(parts)
 
     def add_vertex(self, v: Vertex):
-        if v.id not in self.vertices:
-            self.vertices[v.id] = v
-            self.adjacency[v.id] = []
+        self._stamp += 1
+        if self._dense:
+            if v.id == len(self._vertices):
+                self._vertices.append(v)
+                self._adjacency.append({})
+                return
+            self._to_sparse()
+
+        if v.id not in self._vertices:
+            self._vertices[v.id] = v
+            self._adjacency[v.id] = {}
         else:
             raise ValueError(f"Vertex with id {v.id} already exists")
         
     def has_vertex(self, v: Vertex) -> bool:
         """Check if a vertex exists in the graph."""
-        return v.id in self.vertices
+        return self._has_vertex_id(v.id)
 
     def add_edge(self, e: Edge):
         # Ensure both vertices exist in adjacency
-        if e.source not in self.vertices:
+        if not self._has_vertex_id(e.source):
             raise ValueError(f"Source vertex {e.source} not in graph")
 
-        if e.target not in self.vertices:
+        if not self._has_vertex_id(e.target):
             raise ValueError(f"Target vertex {e.target} not in graph")
 
-        if (e.source, e.target) not in self.edges:
-            self.edges[(e.source, e.target)] = e
-            self.adjacency[e.source].append(e.target)
+        key = (e.source, e.target)
+        if key not in self.edges:
+            self.edges[key] = e
+            self._adjacency[e.source][e.target] = None
+            self._stamp += 1
         else:
             raise ValueError(f"Edge from {e.source} to {e.target} already exists")
         
+    def add_edges(self, edges: Iterable[Edge]):
+        """
+        Add several edges, with the same checks as add_edge. The whole batch is
+        validated first, so the graph is left unchanged if any edge is rejected.
+        """
+        has_vertex_id = self._has_vertex_id
+        self_edges, adjacency = self.edges, self._adjacency
+        batch: dict[tuple[int, int], Edge] = {}
+        for e in edges:
+            source, target = e.source, e.target
+            if not has_vertex_id(source):
+                raise ValueError(f"Source vertex {source} not in graph")
+            if not has_vertex_id(target):
+                raise ValueError(f"Target vertex {target} not in graph")
+            key = (source, target)
+            if key in self_edges or key in batch:
+                raise ValueError(f"Edge from {source} to {target} already exists")
+            batch[key] = e
+
+        for (source, target), e in batch.items():
+            self_edges[(source, target)] = e
+            adjacency[source][target] = None
+        self._stamp += 1
+        
     def has_edge(self, e: Edge) -> bool:
         """Check if an edge exists from source to target."""
         return (e.source, e.target) in self.edges
+
+    def get_edge(self, source: int, target: int) -> Edge:
+        """Return the edge from source to target."""
+        return self.edges[(source, target)]
     
     def remove_edge(self, e: Edge):
         """Remove an edge from the graph."""
-        if (e.source, e.target) in self.edges:
-            del self.edges[(e.source, e.target)]
-            self.adjacency[e.source].remove(e.target)
+        key = (e.source, e.target)
+        if key in self.edges:
+            del self.edges[key]
+            del self._adjacency[e.source][e.target]
+            self._stamp += 1
         else:
             raise ValueError(f"Edge from {e.source} to {e.target} does not exist")
 
@@ -113,48 +267,93 @@ class DirectedGraph(Graph):
 
     def vertex_count(self):
         """Return number of vertices."""
-        return len(self.vertices)
+        return len(self._vertices)
     
     def get_out_degree(self):
         """Compute out-degree for each vertex"""
-        out_degree = {v: 0 for v in self.adjacency.keys()}
-        for source in self.adjacency.keys():
-            out_degree[source] = len(self.adjacency[source])
-        return out_degree
+        return {v: len(targets) for v, targets in self._adjacency_items()}
     
     def get_in_degree(self):
         """Compute in-degree for each vertex"""
-        in_degree = {v: 0 for v in self.adjacency.keys()}
-        for source in self.adjacency.keys():
-            for target in self.adjacency[source]:
-                in_degree[target] += 1
+        in_degree = self._in_degree()
+        if self._dense:
+            return dict(enumerate(in_degree))
         return in_degree
+
+    def _in_degree(self) -> dict[int, int] | list[int]:
+        """Compute in-degree for each vertex, as a list indexed by id when the graph is dense"""
+        if self._dense:
+            in_degree = [0] * len(self._vertices)
+            for targets in self._adjacency:
+                for t in targets:
+                    in_degree[t] += 1
+            return in_degree
+
+        counts = Counter()
+        for targets in self._adjacency.values():
+            counts.update(targets.keys())
+        return {v: counts.get(v, 0) for v in self._vertices}
     
+    def is_acyclic(self) -> bool:
+        """Check whether the graph has no cycles, without building the topological order"""
+        in_degree = self._in_degree()
+
+        # Kahn's algorithm, only counting the vertices that can be removed
+        adjacency = self._adjacency
+        stack = [v for v in self._vertex_ids() if in_degree[v] == 0]
+        pop, push = stack.pop, stack.append
+        processed = 0
+
+        while stack:
+            current = pop()
+            processed += 1
+            for target in adjacency[current]:
+                in_degree[target] -= 1
+                if in_degree[target] == 0:
+                    push(target)
+
+        return processed == len(self._vertices)
+
     def topological_sort(self):
         """Perform topological sort to get a valid ordering of transactions"""
+
+        # Reuse the order computed since the last edit, None marks a cycle
+        stamp = (self._stamp, len(self.edges))
+        if self._topo_cache is not None and self._topo_cache[0] == stamp:
+            topo_order = self._topo_cache[1]
+            if topo_order is None:
+                raise CyclicGraphError("Graph contains a cycle")
+            return list(topo_order)
         
         # Compute in-degree for each vertex
-        in_degree = self.get_in_degree()
+        in_degree = self._in_degree()
         
-        # Kahn's algorithm for topological sort
-        vertices = self.vertices.keys()
-        queue = [v for v in vertices if in_degree[v] == 0]
+        # Kahn's algorithm for topological sort, using a min-heap of
+        # vertex ids as the active set for deterministic output
+        vertices = self._vertex_ids()
+        heap = [v for v in vertices if in_degree[v] == 0]
+        heapq.heapify(heap)
         topo_order = []
+
+        # Bind lookups used in the loop to locals
+        adjacency = self._adjacency
+        heappush, heappop = heapq.heappush, heapq.heappop
+        append = topo_order.append
         
-        while queue:
-            # Sort for deterministic output
-            queue.sort()
-            current = queue.pop(0)
-            topo_order.append(current)
+        while heap:
+            current = heappop(heap)
+            append(current)
             
             # Reduce in-degree for neighbors
-            for target in self.adjacency[current]:
+            for target in adjacency[current]:
                 in_degree[target] -= 1
                 if in_degree[target] == 0:
-                    queue.append(target)
+                    heappush(heap, target)
         
         # Check if graph has a cycle
         if len(topo_order) != len(vertices):
+            self._topo_cache = (stamp, None)
             raise CyclicGraphError("Graph contains a cycle")
         
-        return topo_order
+        self._topo_cache = (stamp, topo_order)
+        return list(topo_order)
@@ -1,6 +1,6 @@
 from dataclasses import dataclass, field
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Vertex:
     id: int
     label: object = field(default=None)
@@ -11,7 +11,7 @@ class Vertex:
         else:
             return f"V_{self.id}"
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Edge:
     source: int
     target: int
@@ -1,8 +1,12 @@
-from dataclasses import dataclass
-from enum import Enum, auto
+import re
+import sys
+from dataclasses import dataclass, field
+from enum import Enum, IntEnum, auto
 from typing import List, Dict, Set, Optional, Iterable
 
-class OperationType(Enum):
+class OperationType(IntEnum):
+    # Members are ints so that the lock and access loops compare plain integers.
+    # XLOCK and SLOCK are kept consecutive so that a lock test is a range check.
     READ = auto()
     WRITE = auto()
     LOCK = auto()
@@ -12,11 +16,63 @@ class OperationType(Enum):
     COMMIT = auto()
     ROLLBACK = auto()
 
-@dataclass
+    # Keep the Enum text representation, e.g. OperationType.READ
+    __str__ = Enum.__str__
+    __format__ = Enum.__format__
+
+# Pattern and token maps used by Operation.parse
+_OP_RE = re.compile(r"^(?:(COMMIT|ROLLBACK)_(-?\d+)|(R|W|L|SL|XL|U)_(-?\d+)\(([^()]*)\))$")
+
+_END_OP_MAP = {
+    "COMMIT": OperationType.COMMIT,
+    "ROLLBACK": OperationType.ROLLBACK,
+}
+
+_OP_MAP = {
+    "R": OperationType.READ,
+    "W": OperationType.WRITE,
+    "L": OperationType.LOCK,
+    "SL": OperationType.SLOCK,
+    "XL": OperationType.XLOCK,
+    "U": OperationType.UNLOCK,
+}
+
+# Formatters by operation type, used by Operation.__str__ and Operation.latex
+_STR_FORMATTERS = {
+    OperationType.READ: lambda o: f"R_{o.tx}({o.item})",
+    OperationType.WRITE: lambda o: f"W_{o.tx}({o.item})",
+    OperationType.LOCK: lambda o: f"L_{o.tx}({o.item})",
+    OperationType.UNLOCK: lambda o: f"U_{o.tx}({o.item})",
+    OperationType.SLOCK: lambda o: f"SL_{o.tx}({o.item})",
+    OperationType.XLOCK: lambda o: f"XL_{o.tx}({o.item})",
+    OperationType.COMMIT: lambda o: f"COMMIT_{o.tx}",
+    OperationType.ROLLBACK: lambda o: f"ROLLBACK_{o.tx}",
+}
+
+_LATEX_FORMATTERS = {
+    OperationType.READ: lambda o: f"r_{{{o.tx}}}({o.item})",
+    OperationType.WRITE: lambda o: f"w_{{{o.tx}}}({o.item})",
+    OperationType.LOCK: lambda o: f"l_{{{o.tx}}}({o.item})",
+    OperationType.UNLOCK: lambda o: f"u_{{{o.tx}}}({o.item})",
+    OperationType.SLOCK: lambda o: f"sl_{{{o.tx}}}({o.item})",
+    OperationType.XLOCK: lambda o: f"xl_{{{o.tx}}}({o.item})",
+    OperationType.COMMIT: lambda o: f"\\text{{COMMIT}}_{{{o.tx}}}",
+    OperationType.ROLLBACK: lambda o: f"\\text{{ROLLBACK}}_{{{o.tx}}}",
+}
+
+@dataclass(frozen=True, slots=True)
 class Operation:
     tx: int
     op: OperationType
     item: str = None
+    _key: tuple = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Operations are immutable, fields are set through object.__setattr__
+        # Intern item names so that comparing equal items is a pointer compare
+        if type(self.item) is str:
+            object.__setattr__(self, "item", sys.intern(self.item))
+        object.__setattr__(self, "_key", (self.tx, self.op, self.item))
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, Operation):
@@ -27,44 +83,16 @@ class Operation:
         return f"Operation(tx={self.tx}, op={self.op}, item={self.item})"
 
     def __str__(self):
-        if self.op in {
-            OperationType.READ,
-            OperationType.WRITE,
-            OperationType.LOCK,
-            OperationType.UNLOCK
-        }:
-            return f"{self.op.name[0]}_{self.tx}({self.item})"
-        elif self.op in {
-            OperationType.SLOCK,
-            OperationType.XLOCK,
-        }:
-            return f"{self.op.name[:2]}_{self.tx}({self.item})"
-        elif self.op == OperationType.COMMIT:
-            return f"COMMIT_{self.tx}"
-        elif self.op == OperationType.ROLLBACK:
-            return f"ROLLBACK_{self.tx}"
-        else:
+        formatter = _STR_FORMATTERS.get(self.op)
+        if formatter is None:
             return f"UNKNOWN_OP_{self.tx}"
+        return formatter(self)
         
     def latex(self) -> str:
-        if self.op in {
-            OperationType.READ,
-            OperationType.WRITE,
-            OperationType.LOCK,
-            OperationType.UNLOCK
-        }:
-            return f"{self.op.name[0].lower()}_{{{self.tx}}}({self.item})"
-        elif self.op in {
-            OperationType.SLOCK,
-            OperationType.XLOCK,
-        }:
-            return f"{self.op.name[:2].lower()}_{{{self.tx}}}({self.item})"
-        elif self.op == OperationType.COMMIT:
-            return f"\\text{{COMMIT}}_{{{self.tx}}}"
-        elif self.op == OperationType.ROLLBACK:
-            return f"\\text{{ROLLBACK}}_{{{self.tx}}}"
-        else:
+        formatter = _LATEX_FORMATTERS.get(self.op)
+        if formatter is None:
             return f"\\text{{UNKNOWN\_OP}}_{{{self.tx}}}"
+        return formatter(self)
         
     @staticmethod
     def parse(value: str) -> 'Operation':
@@ -73,45 +101,18 @@ class Operation:
         Examples: R_1(A), W_2(B), COMMIT_3, ROLLBACK_4, L_1(X), SL_2(Y), XL_3(Z)
         """
         value = value.strip()
-        
-        # Handle COMMIT
-        if value.startswith("COMMIT_"):
-            tx = int(value.split("_")[1])
-            return Operation(tx, OperationType.COMMIT)
-        
-        # Handle ROLLBACK
-        if value.startswith("ROLLBACK_"):
-            tx = int(value.split("_")[1])
-            return Operation(tx, OperationType.ROLLBACK)
-        
-        # Handle operations with items: R_1(A), W_2(B), etc.
-        if "(" in value and value.endswith(")"):
-            op_part, item_part = value.split("(")
-            item = item_part[:-1]  # Remove closing parenthesis
-            
-            parts = op_part.split("_")
-            op_name = parts[0]
-            tx = int(parts[1])
-            
-            op_map = {
-                "R": OperationType.READ,
-                "W": OperationType.WRITE,
-                "L": OperationType.LOCK,
-                "SL": OperationType.SLOCK,
-                "XL": OperationType.XLOCK,
-                "U": OperationType.UNLOCK
-            }
-            
-            if op_name in op_map:
-                return Operation(tx, op_map[op_name], item)
+
+        m = _OP_RE.match(value)
+        if m is not None:
+            end_op, end_tx, op_name, tx, item = m.groups()
+            if end_op is not None:
+                return Operation(int(end_tx), _END_OP_MAP[end_op])
+            return Operation(int(tx), _OP_MAP[op_name], item)
         
         raise ValueError(f"Cannot parse operation: {value}")
         
     def is_in_conflict_with(self, other: 'Operation') -> bool:
-        if self.item != other.item:
-            return False
-        if self.tx == other.tx:
-            return False
-        if self.op == OperationType.READ and other.op == OperationType.READ:
-            return False
-        return True
\ No newline at end of file
+        # Ordered so that the cheapest and most often false test comes first
+        return (self.item == other.item
+                and self.tx != other.tx
+                and not (self.op is OperationType.READ and other.op is OperationType.READ))
\ No newline at end of file
@@ -1,10 +1,74 @@
+import re
 from typing import Iterable, Optional, Any, List, Protocol
+from collections import Counter
+from functools import lru_cache
+from bisect import bisect_right
+from array import array
 
 from .constants import Constants
-from .operation import OperationType, Operation
+from .operation import OperationType, Operation, _OP_MAP, _END_OP_MAP
 from .directedgraph import DirectedGraph, Vertex, Edge, CyclicGraphError
 
+# Schedule header and operation token used by Schedule.parse. A token is an
+# operation, same as in Operation.parse, or nothing, followed by a comma or
+# the end of the input, so the operations are scanned in a single pass.
+_SCHEDULE_RE = re.compile(r"^S_\s*(-?\d+)\s*:(.*)$", re.DOTALL)
+_OP_TOKEN_RE = re.compile(
+    r"\s*(?:(COMMIT|ROLLBACK)_(-?\d+)|(R|W|L|SL|XL|U)_(-?\d+)\(([^(),]*)\))?\s*(?:(,)|\Z)"
+)
+
+# Only inputs up to this length are cached, to bound the memory held by the cache
+_PARSE_CACHE_MAX_LEN = 4096
+
+def _parse_schedule(value: str) -> tuple[int, tuple[Operation, ...]]:
+    """Parse a schedule string into its id and operations, see Schedule.parse."""
+    m = _SCHEDULE_RE.match(value.strip())
+    if m is None:
+        raise ValueError("Invalid schedule format")
+    
+    schedule_id = int(m.group(1))
+    
+    # Scan the operations token by token, empty tokens are skipped
+    body = m.group(2)
+    match = _OP_TOKEN_RE.match
+    operations = []
+    append = operations.append
+    pos = 0
+    while True:
+        t = match(body, pos)
+        if t is None:
+            token = body[pos:].split(",", 1)[0].strip()
+            raise ValueError(f"Cannot parse operation: {token}")
+        end_op, end_tx, op_name, tx, item, comma = t.groups()
+        if end_op is not None:
+            append(Operation(int(end_tx), _END_OP_MAP[end_op]))
+        elif op_name is not None:
+            append(Operation(int(tx), _OP_MAP[op_name], item))
+        if comma is None:
+            break
+        pos = t.end()
+    
+    return schedule_id, tuple(operations)
+
+_parse_schedule_cached = lru_cache(maxsize=1024)(_parse_schedule)
+
+# Operation types that access data items
+_RW_OPS = frozenset({OperationType.READ, OperationType.WRITE})
+
+# Operation types that end a transaction
+_END_OPS = frozenset({OperationType.COMMIT, OperationType.ROLLBACK})
+
 class Schedule():
+    __slots__ = (
+        "id",
+        "operations",
+        "_conflict_graph",
+        "_precedence_graph",
+        "_wait_for_graph",
+        "_conflict_sets",
+        "_columns",
+    )
+
     def __init__(
         self,
         id: int = None,
@@ -13,55 +77,161 @@ class Schedule():
         self.id: int = id
         self.operations: List[Operation] = list(operations) if operations else []
 
+        # Lazily built graphs, see _invalidate_cache
+        self._conflict_graph: Optional[DirectedGraph] = None
+        self._precedence_graph: Optional[DirectedGraph] = None
+        self._wait_for_graph: Optional[DirectedGraph] = None
+        self._conflict_sets: Optional[tuple[frozenset, frozenset]] = None
+        self._columns: Optional[tuple[list[int], list[int], array, int]] = None
+
+    def __getstate__(self) -> tuple[int, List[Operation]]:
+        # Cached graphs are not pickled, they are rebuilt on demand
+        return self.id, self.operations
+
+    def __setstate__(self, state: tuple[int, List[Operation]]):
+        self.id, self.operations = state
+        self._invalidate_cache()
+
     def __repr__(self) -> str:
         return f"Schedule(id={self.id}, operations={list.__repr__(self.operations)})"
     
     def __str__(self) -> str:
-        return f"S_{self.id} : {', '.join(str(op) for op in self.operations)}"
+        ops = ', '.join(map(str, self.operations))
+        return f"S_{self.id} : {ops}"
     
     def latex(self) -> str:
-        return f"S_{{{self.id}}} : {', '.join(op.latex() for op in self.operations)}"
+        ops = ', '.join([op.latex() for op in self.operations])
+        return f"S_{{{self.id}}} : {ops}"
     
     @staticmethod
     def parse(value: str) -> 'Schedule':
         """Parse a string representation of a schedule back to a Schedule object.
         
         Example: S_1 : R_1(A), W_1(B), COMMIT_1
+
+        Parsed operations of short inputs are cached by input string and shared
+        between the returned schedules, each call returns a new Schedule.
         """
-        value = value.strip()
-        
-        if not value.startswith("S_"):
-            raise ValueError("Invalid schedule format")
-        
-        id_part, ops_part = value.split(":", 1)
-        schedule_id = int(id_part.split("_")[1].strip())
-        
-        operations = []
-        for op_str in ops_part.split(","):
-            op_str = op_str.strip()
-            if op_str:
-                operation = Operation.parse(op_str)
-                operations.append(operation)
-        
+        if len(value) <= _PARSE_CACHE_MAX_LEN:
+            schedule_id, operations = _parse_schedule_cached(value)
+        else:
+            schedule_id, operations = _parse_schedule(value)
         return Schedule(id=schedule_id, operations=operations)
 
+    def _invalidate_cache(self):
+        """
+        Drop the cached graphs and columns. Operations are not mutated anywhere in the
+        library, but this must be called after mutating `operations` by hand.
+        """
+        self._conflict_graph = None
+        self._precedence_graph = None
+        self._wait_for_graph = None
+        self._conflict_sets = None
+        self._columns = None
+
+    def _interned_columns(self) -> tuple[list[int], list[int], array, int]:
+        """
+        Return the operations as parallel columns: transaction ids, item ids
+        and operation types, plus the number of distinct items. Every data item
+        is mapped to a small integer id in the order of first access, item-less
+        operations get -1. The result is cached.
+        """
+        if self._columns is None:
+            ops = self.operations
+            item_to_idx: dict[str, int] = {}
+            item_idx = []
+            for op in ops:
+                item = op.item
+                if item is None:
+                    item_idx.append(-1)
+                else:
+                    idx = item_to_idx.get(item)
+                    if idx is None:
+                        idx = item_to_idx[item] = len(item_to_idx)
+                    item_idx.append(idx)
+            self._columns = (
+                [op.tx for op in ops],
+                item_idx,
+                array('b', [op.op for op in ops]),
+                len(item_to_idx)
+            )
+        return self._columns
+
+    def _conflict_pairs(self) -> list[tuple[int, int]]:
+        """
+        Return the (i, j) index pairs, i < j, of conflicting operations, sorted
+        as the nested loop over (i, j) would find them.
+        """
+        txs, item_idx, kinds, n_items = self._interned_columns()
+
+        # Only operations on the same item can conflict, so bucket the
+        # operation indices by item and compare pairs within each bucket.
+        # Item-less operations (COMMIT/ROLLBACK) share the last bucket, as
+        # Operation.is_in_conflict_with treats their None items as equal
+        buckets: list[list[int]] = [[] for _ in range(n_items + 1)]
+        for i, idx in enumerate(item_idx):
+            buckets[idx].append(i)
+
+        READ = OperationType.READ
+        is_read = [kind == READ for kind in kinds]
+
+        pairs = []
+        append = pairs.append
+        for idxs in buckets:
+            # A read only conflicts with later writes, so reads scan the
+            # writes of the bucket and never test read-read pairs
+            writes = [i for i in idxs if not is_read[i]]
+            for a in range(len(idxs)):
+                i = idxs[a]
+                ti = txs[i]
+                if is_read[i]:
+                    for j in writes[bisect_right(writes, i):]:
+                        if ti != txs[j]:
+                            append((i, j))
+                else:
+                    for b in range(a + 1, len(idxs)):
+                        j = idxs[b]
+                        if ti != txs[j]:
+                            append((i, j))
+
+        # Pairs come out grouped by item, sort them back into index order so
+        # graphs list their edges in the same order as before
+        pairs.sort()
+        return pairs
+
+    def _conflict_signature(self) -> tuple[frozenset, frozenset]:
+        """
+        Return the multiset of operation keys, as a set of (key, count) pairs, and
+        the set of conflict edges between operation keys, without building a graph.
+        Conflict-equivalent schedules have equal signatures. The result is cached.
+        """
+        if self._conflict_sets is None:
+            keys = [op._key for op in self.operations]
+            self._conflict_sets = (
+                frozenset(Counter(keys).items()),
+                frozenset((keys[i], keys[j]) for i, j in self._conflict_pairs())
+            )
+        return self._conflict_sets
+
     def build_conflict_graph(self) -> DirectedGraph:
         """
         Build a conflict graph for the given schedule.
         Returns a DirectedGraph whose vertices are operation indices and an indegree list.
+        The graph is cached on the schedule and shared between callers.
         """
+        if self._conflict_graph is not None:
+            return self._conflict_graph
+
         ops = self.operations
         n = len(ops)
 
-        # Create a DirectedGraph instance without calling its constructor to avoid signature issues
-        vertices = [Vertex(id=i, label=ops[i]) for i in range(n)]
-        graph = DirectedGraph(vertices=vertices)
+        edges = [Edge(source=i, target=j) for i, j in self._conflict_pairs()]
 
-        for i in range(n):
-            for j in range(i + 1, n):
-                if ops[i].is_in_conflict_with(ops[j]):
-                    graph.add_edge(Edge(source=i, target=j))
+        # Vertex ids are the operation indices, unique by construction
+        vertices = [Vertex(id=i, label=ops[i]) for i in range(n)]
+        graph = DirectedGraph._from_known_unique(vertices, edges)
 
+        self._conflict_graph = graph
         return graph
     
     def is_conflict_equivalent_with(self, other: 'Schedule') -> bool:
@@ -70,39 +240,47 @@ class Schedule():
         """
         if len(self.operations) != len(other.operations):
             return False
-        
-        g1 = self.build_conflict_graph()
-        g2 = other.build_conflict_graph()
-        
-        return self.are_conflict_graphs_isomorphic(g1, g2)
+
+        # Schedules must consist of the same multiset of operations with the
+        # same conflicts, both are part of the signature cached on each schedule
+        return self._conflict_signature() == other._conflict_signature()
     
     def are_conflict_graphs_isomorphic(self, this: DirectedGraph, other: DirectedGraph) -> bool:
         """Check if this directed graph is isomorphic to another directed graph."""
         
+        # Map vertex ids to hashable keys once per graph. Operation labels use
+        # their key, any other labels are compared by their string form
+        this_labels = { vid: v.label for vid, v in this._vertex_items() }
+        other_labels = { vid: v.label for vid, v in other._vertex_items() }
+        if all(isinstance(label, Operation)
+               for labels in (this_labels, other_labels) for label in labels.values()):
+            this_keys = { vid: label._key for vid, label in this_labels.items() }
+            other_keys = { vid: label._key for vid, label in other_labels.items() }
+        else:
+            this_keys = { vid: str(label) for vid, label in this_labels.items() }
+            other_keys = { vid: str(label) for vid, label in other_labels.items() }
+
         # Make sure both graphs have the same set of vertex labels
-        this_vertices = { str(v.label) for v in this.vertices.values() }
-        other_vertices = { str(v.label) for v in other.vertices.values() }
-        if this_vertices != other_vertices:
+        if frozenset(this_keys.values()) != frozenset(other_keys.values()):
             return False
         
         # Make sure both graphs have the same set of edges
-        this_edges = { (str(this.vertices[source].label),
-                        str(this.vertices[target].label))
-                       for (source, target), e in this.edges.items() }
-        other_edges = { (str(other.vertices[source].label),
-                         str(other.vertices[target].label))
-                       for (source, target), e in other.edges.items() }
-
-        if this_edges != other_edges:
-            return False
-        
-        return True
+        this_edges = frozenset((this_keys[e.source], this_keys[e.target])
+                               for e in this.edges.values())
+        other_edges = frozenset((other_keys[e.source], other_keys[e.target])
+                                for e in other.edges.values())
+
+        return this_edges == other_edges
     
     def build_precedence_graph(self) -> DirectedGraph:
         """
         Build a precedence graph for the given schedule.
         Returns a DirectedGraph whose vertices are transaction IDs.
+        The graph is cached on the schedule and shared between callers.
         """
+        if self._precedence_graph is not None:
+            return self._precedence_graph
+
         ops = self.operations
         transactions = {}
         
@@ -111,46 +289,57 @@ class Schedule():
             if op.tx not in transactions:
                 transactions[op.tx] = Vertex(id=op.tx, label=op.tx)
         
-        graph = DirectedGraph(vertices=list(transactions.values()))
-        
-        # Add edges based on operation order
-        for i in range(len(ops)):
-            for j in range(i + 1, len(ops)):
-                if ops[i].tx != ops[j].tx and ops[i].is_in_conflict_with(ops[j]):
-                    edge = Edge(source=ops[i].tx, target=ops[j].tx)
-                    if not graph.has_edge(edge):
-                        graph.add_edge(edge)
-        
+        # Collect the unique transaction pairs of the conflicting operations,
+        # in the order they are first seen by operation index, so the edges
+        # are listed as the original pairwise scan added them
+        txs = self._interned_columns()[0]
+        seen: set[tuple[int, int]] = set()
+        pairs: list[tuple[int, int]] = []
+        for i, j in self._conflict_pairs():
+            pair = (txs[i], txs[j])
+            if pair not in seen:
+                seen.add(pair)
+                pairs.append(pair)
+
+        graph = DirectedGraph._from_known_unique(
+            transactions.values(),
+            (Edge(source=source, target=target) for source, target in pairs)
+        )
+
+        self._precedence_graph = graph
         return graph
     
+    def _precedence_and_order(self) -> tuple[DirectedGraph, list[int]]:
+        """
+        Return the precedence graph and a serial order of the transactions.
+        Raises CyclicGraphError if the precedence graph has a cycle.
+        """
+        graph = self.build_precedence_graph()
+        return graph, graph.topological_sort()
+
     def is_conflict_serializable(self) -> bool:
         """
         Check if the schedule is conflict-serializable by verifying if its conflict graph is acyclic.
         """
-        graph = self.build_precedence_graph()
-        
-        try:
-            graph.topological_sort()
-            return True
-        except CyclicGraphError:
-            return False
+        return self.build_precedence_graph().is_acyclic()
         
     def serialize(self) -> 'Schedule':
         """
         Return a serial schedule equivalent to this schedule if it is conflict-serializable.
         Raises an error if the schedule is not conflict-serializable.
         """
-        if not self.is_conflict_serializable():
+        try:
+            _, sorted_tx_ids = self._precedence_and_order()
+        except CyclicGraphError:
             raise ValueError("Schedule is not conflict-serializable")
         
-        precedence_graph = self.build_precedence_graph()
-        sorted_tx_ids = precedence_graph.topological_sort()
-        
-        serial_operations = []
-        for tx_id in sorted_tx_ids:
-            for op in self.operations:
-                if op.tx == tx_id:
-                    serial_operations.append(op)
+        # Bucket operations by transaction, keeping their original order
+        by_tx: dict[int, list[Operation]] = {}
+        for op in self.operations:
+            by_tx.setdefault(op.tx, []).append(op)
+
+        # Every transaction id in the order has operations, since the graph is built from them
+        serial_operations = [op for tx_id in sorted_tx_ids for op in by_tx[tx_id]]
         
         return Schedule(id=self.id, operations=serial_operations)
     
@@ -159,7 +348,11 @@ class Schedule():
         Build a wait-for graph for the given schedule.
         Returns a DirectedGraph whose vertices are transaction IDs.
         Uses XLOCK, SLOCK, and UNLOCK operations to track lock conflicts.
+        The graph is cached on the schedule and shared between callers.
         """
+        if self._wait_for_graph is not None:
+            return self._wait_for_graph
+
         ops = self.operations
         transactions = {}
         
@@ -168,91 +361,98 @@ class Schedule():
             if op.tx not in transactions:
                 transactions[op.tx] = Vertex(id=op.tx, label=op.tx)
         
-        graph = DirectedGraph(vertices=list(transactions.values()))
-        
-        lock_table = {}
+        # Per-item lock state, indexed by interned item id
+        txs, item_idx, kinds, n_items = self._interned_columns()
+        excl: list[Optional[int]] = [None] * n_items
+        shared: list[set[int]] = [set() for _ in range(n_items)]
+
+        # Unique (waiting, holding) transaction pairs, in the order first seen
+        edge_pairs: dict[tuple[int, int], None] = {}
+
+        SLOCK, XLOCK, UNLOCK = OperationType.SLOCK, OperationType.XLOCK, OperationType.UNLOCK
         
-        for op in ops:
-            item = op.item
-            tx_id = op.tx
-            
-            if item not in lock_table:
-                lock_table[item] = {'shared_locks': set(), 'exclusive_lock': None}
-            
-            locks = lock_table[item]
+        for tx_id, idx, kind in zip(txs, item_idx, kinds):
+            # COMMIT and ROLLBACK carry no item and never touch the lock table
+            if idx < 0:
+                continue
             
-            if op.op == OperationType.SLOCK:
+            if kind == SLOCK:
                 # S-lock waits if there's an X-lock by another transaction
-                if locks['exclusive_lock'] is not None and locks['exclusive_lock'] != tx_id:
-                    graph.add_edge(Edge(source=tx_id, target=locks['exclusive_lock']))
-                locks['shared_locks'].add(tx_id)
+                holder = excl[idx]
+                if holder is not None and holder != tx_id:
+                    edge_pairs[(tx_id, holder)] = None
+                shared[idx].add(tx_id)
             
-            elif op.op == OperationType.XLOCK:
+            elif kind == XLOCK:
                 # X-lock waits for all other S-locks
-                for holder in locks['shared_locks']:
-                    if holder != tx_id:
-                        graph.add_edge(Edge(source=tx_id, target=holder))
+                holders = shared[idx]
+                if holders:
+                    edge_pairs.update(dict.fromkeys((tx_id, h) for h in holders - {tx_id}))
+                    # The S-locks of other transactions are kept, a later lock
+                    # request on the item still waits for them
+                    holders.discard(tx_id)
                 # X-lock waits if there's an X-lock by another transaction
-                if locks['exclusive_lock'] is not None and locks['exclusive_lock'] != tx_id:
-                    graph.add_edge(Edge(source=tx_id, target=locks['exclusive_lock']))
-                locks['exclusive_lock'] = tx_id
-                locks['shared_locks'].discard(tx_id)
+                holder = excl[idx]
+                if holder is not None and holder != tx_id:
+                    edge_pairs[(tx_id, holder)] = None
+                excl[idx] = tx_id
             
-            elif op.op == OperationType.UNLOCK:
+            elif kind == UNLOCK:
                 # Release locks
-                if locks['exclusive_lock'] == tx_id:
-                    locks['exclusive_lock'] = None
-                locks['shared_locks'].discard(tx_id)
+                if excl[idx] == tx_id:
+                    excl[idx] = None
+                shared[idx].discard(tx_id)
+
+        graph = DirectedGraph._from_known_unique(
+            transactions.values(),
+            (Edge(source=source, target=target) for source, target in edge_pairs)
+        )
         
+        self._wait_for_graph = graph
         return graph
     
     def has_deadlock(self) -> bool:
         """Test if the schedule has a deadlock by checking for cycles in the wait-for graph."""
-        graph = self.build_wait_for_graph()
-        
-        try:
-            graph.topological_sort()
-            return False
-        except CyclicGraphError:
-            return True
+        return not self.build_wait_for_graph().is_acyclic()
         
     def is_legal(self) -> bool:
         """
         Check if the schedule is legal with respect to locking protocols.
         Ensures that no operation is performed on an item without holding the appropriate lock.
         """
-        lock_table = {}
+        # Per-item lock state, indexed by interned item id
+        txs, item_idx, kinds, n_items = self._interned_columns()
+        excl: list[Optional[int]] = [None] * n_items
+        shared: list[set[int]] = [set() for _ in range(n_items)]
+
+        READ, WRITE = OperationType.READ, OperationType.WRITE
+        SLOCK, XLOCK, UNLOCK = OperationType.SLOCK, OperationType.XLOCK, OperationType.UNLOCK
         
-        for op in self.operations:
-            item = op.item
-            tx_id = op.tx
-            
-            if item not in lock_table:
-                lock_table[item] = {'shared_locks': set(), 'exclusive_lock': None}
+        for tx_id, idx, kind in zip(txs, item_idx, kinds):
+            # COMMIT and ROLLBACK carry no item and never touch the lock table
+            if idx < 0:
+                continue
             
-            locks = lock_table[item]
+            if kind == SLOCK:
+                shared[idx].add(tx_id)
             
-            if op.op == OperationType.SLOCK:
-                locks['shared_locks'].add(tx_id)
+            elif kind == XLOCK:
+                excl[idx] = tx_id
+                shared[idx].discard(tx_id)
             
-            elif op.op == OperationType.XLOCK:
-                locks['exclusive_lock'] = tx_id
-                locks['shared_locks'].discard(tx_id)
+            elif kind == UNLOCK:
+                if excl[idx] == tx_id:
+                    excl[idx] = None
+                shared[idx].discard(tx_id)
             
-            elif op.op == OperationType.UNLOCK:
-                if locks['exclusive_lock'] == tx_id:
-                    locks['exclusive_lock'] = None
-                locks['shared_locks'].discard(tx_id)
+            # Check if the transaction holds the necessary lock
+            elif kind == READ:
+                if excl[idx] != tx_id and tx_id not in shared[idx]:
+                    return False
             
-            elif op.op in {OperationType.READ, OperationType.WRITE}:
-                # Check if the transaction holds the necessary lock
-                if op.op == OperationType.READ:
-                    if (locks['exclusive_lock'] != tx_id and
-                        tx_id not in locks['shared_locks']):
-                        return False
-                elif op.op == OperationType.WRITE:
-                    if locks['exclusive_lock'] != tx_id:
-                        return False
+            elif kind == WRITE:
+                if excl[idx] != tx_id:
+                    return False
         
         return True
     
@@ -262,22 +462,19 @@ class Schedule():
         Ensures that each transaction has a growing phase (acquiring locks)
         followed by a shrinking phase (releasing locks) without interleaving.
         """
-        tx_phases = {}
+        # A transaction is two-phase if it locks nothing after its first unlock,
+        # stop at the first lock of a transaction that has already unlocked
+        shrinking: set[int] = set()
+
+        XLOCK, SLOCK, UNLOCK = OperationType.XLOCK, OperationType.SLOCK, OperationType.UNLOCK
         
         for op in self.operations:
-            tx_id = op.tx
-            
-            if tx_id not in tx_phases:
-                tx_phases[tx_id] = 'growing'
-            
-            phase = tx_phases[tx_id]
-            
-            if op.op in {OperationType.SLOCK, OperationType.XLOCK}:
-                if phase == 'shrinking':
-                    return False  # Cannot acquire locks in shrinking phase
-            
-            elif op.op == OperationType.UNLOCK:
-                tx_phases[tx_id] = 'shrinking'  # Transition to shrinking phase
+            kind = op.op
+            if XLOCK <= kind <= SLOCK:
+                if op.tx in shrinking:
+                    return False
+            elif kind == UNLOCK:
+                shrinking.add(op.tx)
         
         return True
     
@@ -298,60 +495,67 @@ class Schedule():
             A new Schedule with LOCK and UNLOCK operations added
         """
 
+        ops = self.operations
+        rw_ops, end_ops = _RW_OPS, _END_OPS
+        READ, LOCK, SLOCK, XLOCK, UNLOCK = (
+            OperationType.READ, OperationType.LOCK, OperationType.SLOCK,
+            OperationType.XLOCK, OperationType.UNLOCK
+        )
+
+        # Index of the last READ/WRITE of each (tx, item), in a single reverse pass
+        last_idx = {}
+        for i in range(len(ops) - 1, -1, -1):
+            op = ops[i]
+            if op.op in rw_ops:
+                last_idx.setdefault((op.tx, op.item), i)
+
         # Track which items each transaction has locked and the lock type
-        locked_items = {tx: {} for tx in set(op.tx for op in self.operations)}
+        locked_items = {tx: {} for tx in set(op.tx for op in ops)}
         new_operations = []
+        append = new_operations.append
         
-        for i, op in enumerate(self.operations):
-            if op.op in {OperationType.READ, OperationType.WRITE}:
+        for i, op in enumerate(ops):
+            if op.op in rw_ops:
                 # Determine required lock type
                 if use_shared_locks:
-                    required_lock = OperationType.SLOCK if op.op == OperationType.READ else OperationType.XLOCK
+                    required_lock = SLOCK if op.op == READ else XLOCK
                 else:
-                    required_lock = OperationType.LOCK
+                    required_lock = LOCK
                 
                 # Check current lock status
                 current_lock = locked_items[op.tx].get(op.item)
                 
                 if current_lock is None:
                     # No lock held, acquire the required lock
-                    new_operations.append(Operation(tx=op.tx, op=required_lock, item=op.item))
+                    append(Operation(tx=op.tx, op=required_lock, item=op.item))
                     locked_items[op.tx][op.item] = required_lock
                         
-                elif use_shared_locks and current_lock == OperationType.SLOCK and required_lock == OperationType.XLOCK:
+                elif use_shared_locks and current_lock == SLOCK and required_lock == XLOCK:
                     # Upgrade from SLOCK to XLOCK
-                    new_operations.append(Operation(tx=op.tx, op=OperationType.XLOCK, item=op.item))
-                    locked_items[op.tx][op.item] = OperationType.XLOCK
+                    append(Operation(tx=op.tx, op=XLOCK, item=op.item))
+                    locked_items[op.tx][op.item] = XLOCK
                 
                 # Add the original operation
-                new_operations.append(op)
-                
-                # Check if this is the last access to this item by this transaction
-                last_use = True
-                for j in range(i + 1, len(self.operations)):
-                    future_op = self.operations[j]
-                    if future_op.tx == op.tx and future_op.item == op.item and future_op.op in {OperationType.READ, OperationType.WRITE}:
-                        last_use = False
-                        break
+                append(op)
                 
-                # Unlock immediately after last access
-                if last_use:
-                    new_operations.append(Operation(tx=op.tx, op=OperationType.UNLOCK, item=op.item))
+                # Unlock immediately after the last access to this item by this transaction
+                if last_idx[(op.tx, op.item)] == i:
+                    append(Operation(tx=op.tx, op=UNLOCK, item=op.item))
                     locked_items[op.tx].pop(op.item, None)
             else:
                 # Non-read/write operations are added as-is
-                new_operations.append(op)
+                append(op)
                 
-                # If transaction ends (COMMIT/ABORT), release any remaining locks
-                if op.op in {OperationType.COMMIT, OperationType.ABORT}:
-                    for item in list(locked_items[op.tx].keys()):
-                        new_operations.append(Operation(tx=op.tx, op=OperationType.UNLOCK, item=item))
-                    locked_items[op.tx].clear()
+                # If transaction ends (COMMIT/ROLLBACK), release any remaining locks
+                if op.op in end_ops:
+                    items = locked_items[op.tx]
+                    if items:
+                        new_operations.extend(Operation(tx=op.tx, op=UNLOCK, item=item) for item in items)
+                        items.clear()
         
         # Release any remaining locks at the end of the schedule
-        for tx in locked_items:
-            for item in list(locked_items[tx].keys()):
-                new_operations.append(Operation(tx=tx, op=OperationType.UNLOCK, item=item))
+        for tx, items in locked_items.items():
+            new_operations.extend(Operation(tx=tx, op=UNLOCK, item=item) for item in items)
         
         return Schedule(id=self.id, operations=new_operations)
     
@@ -359,4 +563,128 @@ class Schedule():
         self,
         use_shared_locks: bool = False
     ) -> "Schedule":
-        pass
+        """
+        Add lock and unlock operations to the given schedule following two-phase locking.
+
+        Locks are acquired right before the first access that needs them, as in add_locks.
+        A transaction releases no lock before it has acquired its last one: at that point
+        it releases the items it no longer accesses, and every other item is unlocked
+        after its last access.
+
+        COMMIT and ROLLBACK release every lock the transaction still holds. Accesses of
+        the same transaction after its COMMIT or ROLLBACK lock their items again, each
+        run between end operations following the rules above. The transaction then
+        locks after it has unlocked, so the result is not two-phase locked. With
+        shared locks, is_two_phase_locked returns False for it; that check only
+        looks at SLOCK and XLOCK, not at plain LOCK.
+
+        Args:
+            use_shared_locks: Whether to use SLOCK/XLOCK or just LOCK
+        Returns:
+            A new Schedule with LOCK and UNLOCK operations added
+        """
+
+        ops = self.operations
+        n = len(ops)
+        txs, item_idx, kinds, n_items = self._interned_columns()
+        READ, WRITE, LOCK, SLOCK, XLOCK, UNLOCK, COMMIT, ROLLBACK = (
+            OperationType.READ, OperationType.WRITE, OperationType.LOCK,
+            OperationType.SLOCK, OperationType.XLOCK, OperationType.UNLOCK,
+            OperationType.COMMIT, OperationType.ROLLBACK
+        )
+
+        # (tx, item) pairs of accesses are packed into single int keys,
+        # unique since 0 <= item index < stride
+        stride = n_items + 1
+        keys = [tx * stride + idx for tx, idx in zip(txs, item_idx)]
+
+        # Forward pass: the lock acquired before each operation, if any, and
+        # the index of the last lock acquisition of each transaction. COMMIT and
+        # ROLLBACK release every lock, so accesses after them lock again and
+        # have their own lock point, kept for the operation that ends a run.
+        lock_at: list[Optional[OperationType]] = [None] * n
+        lock_point_of: list[int] = [-1] * n
+        last_lock: dict[int, int] = {}
+        held: dict[int, dict[int, OperationType]] = {tx: {} for tx in txs}
+        for i in range(n):
+            kind = kinds[i]
+            tx = txs[i]
+            if kind != READ and kind != WRITE:
+                if kind == COMMIT or kind == ROLLBACK:
+                    held[tx].clear()
+                    lock_point_of[i] = last_lock.pop(tx, -1)
+                continue
+            tx_held = held[tx]
+            key = keys[i]
+            current = tx_held.get(key)
+            if use_shared_locks:
+                required = SLOCK if kind == READ else XLOCK
+                if current is None or (current == SLOCK and required == XLOCK):
+                    lock_at[i] = tx_held[key] = required
+            elif current is None:
+                lock_at[i] = tx_held[key] = LOCK
+            if lock_at[i] is not None:
+                last_lock[tx] = i
+
+        # Lock point of every access, taken from the end of its run, or from
+        # the lock points left open at the end of the schedule
+        next_lock_point: dict[int, int] = dict(last_lock)
+        for i in range(n - 1, -1, -1):
+            kind = kinds[i]
+            if kind == COMMIT or kind == ROLLBACK:
+                next_lock_point[txs[i]] = lock_point_of[i]
+            elif kind == READ or kind == WRITE:
+                lock_point_of[i] = next_lock_point[txs[i]]
+
+        # Reverse pass: index of the last access of each (tx, item) within the
+        # run of the transaction that contains each access
+        last_in_run: list[int] = [-1] * n
+        run_last: dict[int, dict[int, int]] = {tx: {} for tx in txs}
+        for i in range(n - 1, -1, -1):
+            kind = kinds[i]
+            if kind == READ or kind == WRITE:
+                last_in_run[i] = run_last[txs[i]].setdefault(keys[i], i)
+            elif kind == COMMIT or kind == ROLLBACK:
+                run_last[txs[i]].clear()
+
+        # Items locked by each transaction, in the order of acquisition, and
+        # the index of their last access in the current run
+        locked_items: dict[int, dict[int, str]] = {tx: {} for tx in txs}
+        release_at: dict[int, dict[int, int]] = {tx: {} for tx in txs}
+        new_operations = []
+        append = new_operations.append
+
+        for i, op in enumerate(ops):
+            tx = txs[i]
+            kind = kinds[i]
+            lock = lock_at[i]
+            if lock is not None:
+                append(Operation(tx=tx, op=lock, item=op.item))
+                items = locked_items[tx]
+                items[item_idx[i]] = op.item
+                release_at[tx][item_idx[i]] = last_in_run[i]
+
+                # Lock point reached, release the items no longer accessed
+                if lock_point_of[i] == i:
+                    last = release_at[tx]
+                    for x in [x for x in items if last[x] < i]:
+                        append(Operation(tx=tx, op=UNLOCK, item=items.pop(x)))
+
+            append(op)
+
+            if kind == READ or kind == WRITE:
+                # After the lock point, unlock right after the last access
+                if lock_point_of[i] <= i and last_in_run[i] == i:
+                    append(Operation(tx=tx, op=UNLOCK, item=locked_items[tx].pop(item_idx[i])))
+            elif kind == COMMIT or kind == ROLLBACK:
+                # If transaction ends (COMMIT/ROLLBACK), release any remaining locks
+                items = locked_items[tx]
+                if items:
+                    new_operations.extend(Operation(tx=tx, op=UNLOCK, item=item) for item in items.values())
+                    items.clear()
+
+        # Release any remaining locks at the end of the schedule
+        for tx, items in locked_items.items():
+            new_operations.extend(Operation(tx=tx, op=UNLOCK, item=item) for item in items.values())
+
+        return Schedule(id=self.id, operations=new_operations)
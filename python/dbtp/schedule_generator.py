@@ -1,11 +1,337 @@
 import random
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
+from operator import itemgetter
+from typing import Iterator, Optional
 from .constants import Constants
-from .directedgraph import DirectedGraph, CyclicGraphError, Vertex, Edge
+from .directedgraph import DirectedGraph, Vertex, Edge
 from .operation import Operation, OperationType
 from .schedule import Schedule
 
 
+# Consecutive duplicate samples after which random permutations are enumerated
+_MAX_DUPLICATE_SAMPLES = 32
+
+# Smallest number of random permutations sampled in worker processes
+_MIN_PARALLEL_COUNT = 64
+
+# Largest random acyclic graph checked for cycles with a transitive closure
+_MAX_CLOSURE_VERTICES = 64
+
+
+def _random_topological_orders(
+    successors: list[tuple[int, ...]],
+    indegree: list[int],
+    rng: Optional[random.Random] = None
+) -> Iterator[list[int]]:
+    """
+    Sample topological orders of a DAG over the nodes 0..n-1 given by successor
+    tuples and indegrees, without end. Each yielded order is a new list.
+
+    Kahn's algorithm picking a random available node at each step. The indegree
+    and available buffers are allocated once and reset for every sample. Random
+    numbers are drawn from rng if given, otherwise from the random module.
+    """
+    n = len(successors)
+    base_indegree = list(indegree)
+    initial_available = [i for i in range(n) if base_indegree[i] == 0]
+    indeg = list(base_indegree)
+    available: list[int] = []
+    randrange = (rng or random).randrange
+
+    while True:
+        indeg[:] = base_indegree
+        available[:] = initial_available
+        order = []
+        append = order.append
+
+        while available:
+            # Randomly choose from available nodes, removing it by moving
+            # the last node into its place
+            j = randrange(len(available))
+            idx = available[j]
+            available[j] = available[-1]
+            available.pop()
+            append(idx)
+
+            # Update indegrees and available nodes
+            for neighbor in successors[idx]:
+                indeg[neighbor] -= 1
+                if indeg[neighbor] == 0:
+                    available.append(neighbor)
+
+        yield order
+
+
+def _sample_topological_orders(
+    successors: list[tuple[int, ...]],
+    indegree: list[int],
+    count: int,
+    seed: int
+) -> list[list[int]]:
+    """Sample count random topological orders with an own seeded generator, run in worker processes."""
+    return list(islice(_random_topological_orders(successors, indegree, random.Random(seed)), count))
+
+
+def _parallel_random_topological_orders(
+    successors: list[tuple[int, ...]],
+    indegree: list[int],
+    processes: int,
+    batch_size: int
+) -> Iterator[list[int]]:
+    """
+    Sample topological orders like _random_topological_orders, in batches drawn
+    by a pool of worker processes. Every batch has its own seed, taken from the
+    random module, so the samples follow the seed of the calling process.
+    The pool is shut down, and batches not started are cancelled, when the
+    generator is closed or garbage collected.
+    """
+    executor = ProcessPoolExecutor(max_workers=processes)
+    try:
+        while True:
+            seeds = [random.getrandbits(64) for _ in range(processes)]
+            batches = executor.map(
+                _sample_topological_orders,
+                repeat(successors), repeat(indegree), repeat(batch_size), seeds
+            )
+            for orders in batches:
+                yield from orders
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+class _IncrementalTopologicalOrder:
+    """
+    Topological order of an acyclic graph kept up to date while edges are added,
+    with the Pearce-Kelly algorithm. An edge that agrees with the current order
+    is added without any search. Otherwise only the vertices ordered between its
+    endpoints are searched, and those reached are renumbered among themselves.
+    """
+
+    def __init__(self, graph: DirectedGraph):
+        self.graph = graph
+        self.order = {v: i for i, v in enumerate(graph.topological_sort())}
+        self.predecessors: dict[int, list[int]] = {v: [] for v in graph._vertex_ids()}
+        for source in graph._vertex_ids():
+            for target in graph._adjacency[source]:
+                self.predecessors[target].append(source)
+
+    def try_add_edge(self, source: int, target: int) -> bool:
+        """Add the edge unless it closes a cycle, return whether it was added."""
+        order = self.order
+        lower, upper = order[target], order[source]
+
+        if upper > lower:
+            # Vertices ordered between the endpoints that target reaches.
+            # Reaching source means the edge would close a cycle.
+            adjacency = self.graph._adjacency
+            forward = []
+            visited = {target}
+            stack = [target]
+            while stack:
+                v = stack.pop()
+                forward.append(v)
+                for w in adjacency[v]:
+                    if w == source:
+                        return False
+                    if w not in visited and order[w] < upper:
+                        visited.add(w)
+                        stack.append(w)
+
+            # Vertices ordered between the endpoints that reach source
+            predecessors = self.predecessors
+            backward = []
+            visited = {source}
+            stack = [source]
+            while stack:
+                v = stack.pop()
+                backward.append(v)
+                for w in predecessors[v]:
+                    if w not in visited and order[w] > lower:
+                        visited.add(w)
+                        stack.append(w)
+
+            # Move the vertices reaching source before those reached from
+            # target, reusing their positions and keeping their relative order
+            backward.sort(key=order.__getitem__)
+            forward.sort(key=order.__getitem__)
+            moved = backward + forward
+            for v, position in zip(moved, sorted(order[v] for v in moved)):
+                order[v] = position
+
+        self.graph.add_edge(Edge(source=source, target=target))
+        self.predecessors[target].append(source)
+        return True
+
+
+class _ReachabilityClosure:
+    """
+    Transitive closure of an acyclic graph kept up to date while edges are added,
+    with the vertices reachable from each vertex as an int bitmask. An edge that
+    would close a cycle is rejected with a single bit test. Adding an edge ORs
+    the reach of its target into every vertex that reaches its source, which is
+    linear in the number of vertices, so this suits small graphs.
+    """
+
+    def __init__(self, graph: DirectedGraph):
+        self.graph = graph
+        ids = list(graph._vertex_ids())
+        self.bit = {v: 1 << i for i, v in enumerate(ids)}
+        self.reach = dict.fromkeys(ids, 0)
+        # Close the existing edges, from the last vertex of a topological order backwards
+        for v in reversed(graph.topological_sort()):
+            for w in graph._adjacency[v]:
+                self.reach[v] |= self.reach[w] | self.bit[w]
+
+    def try_add_edge(self, source: int, target: int) -> bool:
+        """Add the edge unless it closes a cycle, return whether it was added."""
+        reach, bit = self.reach, self.bit
+        source_bit = bit[source]
+        if reach[target] & source_bit:
+            return False
+
+        # Everything that reaches source now also reaches target and beyond
+        gained = reach[target] | bit[target]
+        reach[source] |= gained
+        for v, r in reach.items():
+            if r & source_bit:
+                reach[v] = r | gained
+
+        self.graph.add_edge(Edge(source=source, target=target))
+        return True
+
+
+def _edge_items(graph: DirectedGraph) -> dict[tuple[int, int], str]:
+    """
+    Assign a data item to every edge of the graph, keyed by (source, target).
+    Edges are visited by source vertex, then by insertion order. Labeled edges
+    use their label, the others the letter matching their position.
+    """
+    letters = Constants.LETTERS
+    get_edge = graph.get_edge
+    edge_items = {}
+    for source in graph._vertex_ids():
+        for target in graph._adjacency[source]:
+            label = get_edge(source, target).label
+            edge_items[(source, target)] = letters[len(edge_items)] if label is None else label
+    return edge_items
+
+
+def _successors_and_indegree(graph: DirectedGraph) -> tuple[list[tuple[int, ...]], list[int]]:
+    """
+    Successor tuples and indegrees of a graph over the vertices 0..n-1, such as
+    a conflict graph, as lists indexed by vertex id.
+    """
+    successors = [tuple(graph._adjacency[v]) for v in range(graph.vertex_count())]
+    indegree = [0] * len(successors)
+    for targets in successors:
+        for t in targets:
+            indegree[t] += 1
+    return successors, indegree
+
+
+def _topological_orders(
+    successors: list[tuple[int, ...]],
+    indegree: list[int],
+    twins: Optional[list[int]] = None
+) -> Iterator[list[int]]:
+    """
+    Enumerate all topological orders of a DAG over the nodes 0..n-1 given by
+    successor tuples and indegrees, in lexicographic order. The same list is
+    yielded every time and updated in place, callers must copy what they keep.
+
+    If given, twins[j] is the previous node interchangeable with j, or -1. Node
+    j is not tried while its twin is available, so orders that only swap
+    interchangeable nodes are generated once.
+
+    The search is a depth-first enumeration with an explicit stack instead of
+    recursion. The available nodes are a bitmask, bit i standing for node i,
+    so every level takes an immutable snapshot and its candidates come out in
+    increasing order from the lowest set bit. Each stack entry holds the chosen
+    node, the candidates left at its level and the mask of the nodes the choice
+    made available. Indegrees are updated in place and restored when a choice
+    is undone.
+    """
+    n = len(successors)
+    path: list[int] = []
+    if n == 0:
+        yield path
+        return
+
+    indeg = list(indegree)
+    available = 0
+    for i in range(n):
+        if indeg[i] == 0:
+            available |= 1 << i
+
+    stack: list[tuple[int, int, int]] = [(-1, available, 0)]
+
+    while stack:
+        chosen, remaining, pushed = stack[-1]
+
+        # Undo the previous choice at this level before trying the next one
+        if chosen >= 0:
+            for neigh in successors[chosen]:
+                indeg[neigh] += 1
+            available = (available ^ pushed) | (1 << chosen)
+            path.pop()
+
+        # Take the lowest remaining candidate, skipping nodes whose twin is available
+        while remaining:
+            low = remaining & -remaining
+            remaining ^= low
+            idx = low.bit_length() - 1
+            if twins is None or twins[idx] < 0 or not available >> twins[idx] & 1:
+                break
+        else:
+            stack.pop()
+            continue
+
+        # Choose idx, decrease indegree of neighbors and add newly available nodes
+        path.append(idx)
+        available ^= low
+        pushed = 0
+        for neigh in successors[idx]:
+            indeg[neigh] -= 1
+            if indeg[neigh] == 0:
+                pushed |= 1 << neigh
+        available |= pushed
+        stack[-1] = (idx, remaining, pushed)
+
+        if len(path) == n:
+            yield path
+        else:
+            # Descend with the available nodes of the new level as candidates
+            stack.append((-1, available, 0))
+
+
+def _identical_twins(ops: list[Operation]) -> Optional[list[int]]:
+    """
+    Link every operation to the previous identical one, -1 if there is none, or
+    return None if all operations are distinct. Identical operations belong to
+    the same transaction, so they never conflict with each other, and when both
+    are available for a topological order they have the same conflicts.
+    """
+    twins = []
+    last_seen: dict[tuple, int] = {}
+    for i, op in enumerate(ops):
+        twins.append(last_seen.get(op._key, -1))
+        last_seen[op._key] = i
+    return None if len(last_seen) == len(ops) else twins
+
+
+def _gather(ops: list[Operation], path: list[int]) -> list[Operation]:
+    """Return the operations at the indices of path, in order, picked by a single itemgetter call."""
+    if len(path) > 1:
+        return list(itemgetter(*path)(ops))
+    return [ops[i] for i in path]
+
+
+def _item_bits(edge_items: dict[tuple[int, int], str]) -> dict[str, int]:
+    """Map every distinct data item of the edges to its own bit, in order of first use."""
+    return {item: 1 << i for i, item in enumerate(dict.fromkeys(edge_items.values()))}
+
+
 class ScheduleGenerator:
     @classmethod
     def generate_random_precedence_graph(
@@ -22,7 +348,7 @@ class ScheduleGenerator:
         Args:
             transaction_count: Number of transactions (vertices) in the graph
             edge_count: Number of edges to add to the graph
-            max_attempts: Maximum attempts to generate the desired graph structure
+            max_attempts: Maximum number of candidate edges to try, all of them by default
         Returns:
             A DirectedGraph representing the precedence graph
         """
@@ -42,49 +368,61 @@ class ScheduleGenerator:
             cycle_vertices = random.sample(range(1, transaction_count + 1), cycle_length)
             
             # Add edges to form a cycle
-            for i in range(cycle_length):
-                src = cycle_vertices[i]
-                dst = cycle_vertices[(i + 1) % cycle_length]
-                graph.add_edge(Edge(source=src, target=dst))
+            graph.add_edges([
+                Edge(source=src, target=dst)
+                for src, dst in zip(cycle_vertices, cycle_vertices[1:] + cycle_vertices[:1])
+            ])
             
             added_edges = cycle_length
 
         # Randomly add directed edges while ensuring acyclicity/cyclicity constraint
 
-        max_attempts = edge_count * 20 if max_attempts is None else max_attempts  # Prevent infinite loops
-        attempts = 0
-        
-        while added_edges < edge_count and attempts < max_attempts:
-            attempts += 1
-            src = random.randint(1, transaction_count)
-            dst = random.randint(1, transaction_count)
-            
-            if src == dst:
+        # Acyclic graphs keep their transitive closure, or a topological order
+        # when they are too large for it, to reject cycle-closing edges.
+        # Other graphs accept every new edge.
+        if acyclic and transaction_count <= _MAX_CLOSURE_VERTICES:
+            add_edge = _ReachabilityClosure(graph).try_add_edge
+        elif acyclic:
+            add_edge = _IncrementalTopologicalOrder(graph).try_add_edge
+        else:
+            def add_edge(source: int, target: int) -> bool:
+                graph.add_edge(Edge(source=source, target=target))
+                return True
+
+        # Candidate edges are drawn without replacement by a lazy Fisher-Yates
+        # shuffle of the indices of all ordered pairs (src, dst), src != dst.
+        # Only the swapped positions are stored, so no pair is tried twice and
+        # the full candidate list is never built.
+        others = transaction_count - 1
+        total = transaction_count * others
+        limit = total if max_attempts is None else min(total, max_attempts)
+        swapped: dict[int, int] = {}
+        adjacency = graph._adjacency
+        randrange = random.randrange
+
+        for k in range(limit):
+            if added_edges >= edge_count:
+                break
+
+            j = randrange(k, total)
+            pick = swapped.get(j, j)
+            swapped[j] = swapped.get(k, k)
+
+            # Decode the pair index, skipping the self-loop of each source
+            src, dst = divmod(pick, others)
+            src += 1
+            dst += 1 if dst + 1 < src else 2
+
+            # Check if edge already exists with a hashed lookup, e.g. from the seeded cycle
+            if dst in adjacency[src]:
                 continue
 
-            edge = Edge(source=src, target=dst)
-            
-            # Check if edge already exists
-            if graph.has_edge(edge):
-                continue
-            
-            # Temporarily add edge and check for cycles
-            graph.add_edge(edge)
-            
-            if acyclic:
-                try:
-                    graph.topological_sort()
-                    # Graph is still acyclic, keep the edge
-                    added_edges += 1
-                except CyclicGraphError:
-                    # Graph became cyclic, remove the edge
-                    graph.remove_edge(edge)
-            else:
-                # We want any type of graph, keep the edge
+            # Edges closing a cycle are rejected when the graph must be acyclic
+            if add_edge(src, dst):
                 added_edges += 1
 
-        if attempts == max_attempts:
-            raise RuntimeError(f"Failed to generate acyclic graph within max attempts")
+        if added_edges < edge_count:
+            raise RuntimeError(f"Failed to generate a graph with {edge_count} edges")
 
         return graph
 
@@ -119,28 +457,42 @@ class ScheduleGenerator:
             A Schedule with read and write operations that produce the same precedence graph
         """
         operations = []
+        append = operations.append
+        READ, WRITE = OperationType.READ, OperationType.WRITE
 
-        # For each edge (i, j), assign a unique data item
-        edge_items = {}
-        item_counter = 0
+        # For each edge (i, j), assign a unique data item and record it
+        # as incoming to j and outgoing from i
+        incoming_by_tx = {tx: [] for tx in graph._vertex_ids()}
+        outgoing_by_tx = {tx: [] for tx in graph._vertex_ids()}
 
-        for source in graph.vertices:
-            for target in graph.adjacency[source]:
-                edge = graph.edges[(source, target)]
-                if edge.label is None:
-                    # Create a unique data item for this edge
-                    item_name = f"{Constants.LETTERS[item_counter]}"
-                else:
-                    item_name = edge.label
-                edge_items[(source, target)] = item_name
-                item_counter += 1
+        edge_items = _edge_items(graph)
+        for (source, target), item_name in edge_items.items():
+            incoming_by_tx[target].append(item_name)
+            outgoing_by_tx[source].append(item_name)
+
+        # Sort the items of every transaction once, for deterministic output
+        for items in incoming_by_tx.values():
+            items.sort()
+        for items in outgoing_by_tx.values():
+            items.sort()
 
         # Try topological sort, if it fails (cyclic), use vertex order as-is
         ordering = graph.topological_sort()
 
-        # Track reads/writes already added per transaction to avoid duplicating ops
-        reads_by_tx = {tx: set() for tx in graph.vertices}
-        writes_by_tx = {tx: set() for tx in graph.vertices}
+        if not must_read_written and not must_write_read:
+            # Neither option is set, each transaction reads its incoming items
+            # and writes its outgoing items, no per-transaction tracking is needed
+            for tx1 in ordering:
+                operations.extend(Operation(tx=tx1, op=READ, item=item_name)
+                                  for item_name in incoming_by_tx[tx1])
+                operations.extend(Operation(tx=tx1, op=WRITE, item=item_name)
+                                  for item_name in outgoing_by_tx[tx1])
+            return Schedule(id=1, operations=operations)
+
+        # Reads/writes already added by a transaction are tracked to avoid duplicating
+        # ops, as bitmasks with one bit per data item. Every transaction is visited
+        # once, so its masks are local to its iteration.
+        item_bit = _item_bits(edge_items)
 
         # Generate operations based on ordering
         # For each transaction in order:
@@ -148,43 +500,38 @@ class ScheduleGenerator:
         #   2. Optionally WRITE items for incoming reads (must_write_read)
         #   3. Then, WRITE items for outgoing edges (optionally preceded by a READ)
         for tx1 in ordering:
-            # Collect all incoming edges to this transaction
-            incoming_items = []
-            for tx2 in graph.vertices:
-                for target in graph.adjacency[tx2]:
-                    if target == tx1:
-                        item_name = edge_items[(tx2, tx1)]
-                        incoming_items.append(item_name)
+            # Items of the incoming edges to this transaction
+            incoming_items = incoming_by_tx[tx1]
+            reads = writes = 0
 
             # Add READ operations for incoming edges
-            for item_name in sorted(incoming_items):  # Sort for deterministic output
-                operations.append(Operation(tx=tx1, op=OperationType.READ, item=item_name))
-                reads_by_tx[tx1].add(item_name)
+            for item_name in incoming_items:
+                append(Operation(tx=tx1, op=READ, item=item_name))
+                reads |= item_bit[item_name]
 
-            # Collect all outgoing edges from this transaction
-            outgoing_items = []
-            for target in graph.adjacency[tx1]:
-                item_name = edge_items[(tx1, target)]
-                outgoing_items.append(item_name)
+            # Items of the outgoing edges from this transaction
+            outgoing_items = outgoing_by_tx[tx1]
 
             # If required, ensure reads are followed by writes of same item by same tx
             if must_write_read:
-                for item_name in sorted(incoming_items):
+                outgoing_set = set(outgoing_items)
+                for item_name in incoming_items:
                     # If this transaction already writes this item as an outgoing item, skip
-                    if item_name in outgoing_items or item_name in writes_by_tx[tx1]:
+                    if item_name in outgoing_set or writes & item_bit[item_name]:
                         continue
                     # Append a write for the read item
-                    operations.append(Operation(tx=tx1, op=OperationType.WRITE, item=item_name))
-                    writes_by_tx[tx1].add(item_name)
+                    append(Operation(tx=tx1, op=WRITE, item=item_name))
+                    writes |= item_bit[item_name]
 
             # Add WRITE operations for outgoing edges
-            for item_name in sorted(outgoing_items):  # Sort for deterministic output
-                if must_read_written and item_name not in reads_by_tx[tx1]:
+            for item_name in outgoing_items:
+                bit = item_bit[item_name]
+                if must_read_written and not reads & bit:
                     # Precede the write with a read of the same item by the same transaction
-                    operations.append(Operation(tx=tx1, op=OperationType.READ, item=item_name))
-                    reads_by_tx[tx1].add(item_name)
-                operations.append(Operation(tx=tx1, op=OperationType.WRITE, item=item_name))
-                writes_by_tx[tx1].add(item_name)
+                    append(Operation(tx=tx1, op=READ, item=item_name))
+                    reads |= bit
+                append(Operation(tx=tx1, op=WRITE, item=item_name))
+                writes |= bit
 
         return Schedule(id=1, operations=operations)
 
@@ -212,43 +559,44 @@ class ScheduleGenerator:
             A Schedule with operations that produce the given precedence graph
         """
         operations = []
-        
-        # Track reads/writes per transaction
-        reads_by_tx = {tx: set() for tx in graph.vertices}
-        writes_by_tx = {tx: set() for tx in graph.vertices}
+        append = operations.append
+        READ, WRITE = OperationType.READ, OperationType.WRITE
         
         # Assign unique data items to each edge
-        edge_items = {}
-        item_counter = 0
+        edge_items = _edge_items(graph)
+
+        if not must_read_written and not must_write_read:
+            # Neither option is set, each edge is a write followed by a read
+            for (source, target), item_name in sorted(edge_items.items()):
+                append(Operation(tx=source, op=WRITE, item=item_name))
+                append(Operation(tx=target, op=READ, item=item_name))
+            return Schedule(id=1, operations=operations)
         
-        for source in graph.vertices:
-            for target in graph.adjacency[source]:
-                edge = graph.edges[(source, target)]
-                if edge.label is None:
-                    item_name = f"{Constants.LETTERS[item_counter]}"
-                else:
-                    item_name = edge.label
-                edge_items[(source, target)] = item_name
-                item_counter += 1
+        # Track reads/writes per transaction, as bitmasks with one bit per data item
+        item_bit = _item_bits(edge_items)
+        reads_by_tx = dict.fromkeys(graph._vertex_ids(), 0)
+        writes_by_tx = dict.fromkeys(graph._vertex_ids(), 0)
         
         # Iterate through edges and add operations
         for (source, target), item_name in sorted(edge_items.items()):
+            bit = item_bit[item_name]
+
             # Add WRITE for source transaction
-            if must_read_written and item_name not in reads_by_tx[source]:
-                operations.append(Operation(tx=source, op=OperationType.READ, item=item_name))
-                reads_by_tx[source].add(item_name)
+            if must_read_written and not reads_by_tx[source] & bit:
+                append(Operation(tx=source, op=READ, item=item_name))
+                reads_by_tx[source] |= bit
             
-            operations.append(Operation(tx=source, op=OperationType.WRITE, item=item_name))
-            writes_by_tx[source].add(item_name)
+            append(Operation(tx=source, op=WRITE, item=item_name))
+            writes_by_tx[source] |= bit
             
             # Add READ for target transaction
-            operations.append(Operation(tx=target, op=OperationType.READ, item=item_name))
-            reads_by_tx[target].add(item_name)
+            append(Operation(tx=target, op=READ, item=item_name))
+            reads_by_tx[target] |= bit
             
             # Add WRITE for target if must_write_read is enabled
-            if must_write_read and item_name not in writes_by_tx[target]:
-                operations.append(Operation(tx=target, op=OperationType.WRITE, item=item_name))
-                writes_by_tx[target].add(item_name)
+            if must_write_read and not writes_by_tx[target] & bit:
+                append(Operation(tx=target, op=WRITE, item=item_name))
+                writes_by_tx[target] |= bit
         
         return Schedule(id=1, operations=operations)
 
@@ -260,6 +608,7 @@ class ScheduleGenerator:
     ) -> list[Schedule]:
         """
         Generate all conflict-equivalent permutations of the given schedule.
+        Permutations that only swap identical operations are generated once.
 
         Args:
             schedule: The original schedule to permute
@@ -272,59 +621,23 @@ class ScheduleGenerator:
             return []
 
         ops = schedule.operations
-        n = len(ops)
 
-        # Build conflict graph
+        # Build conflict graph, with the successors of each operation as tuples
         graph = schedule.build_conflict_graph()
-        indegree = graph.get_in_degree()
+        successors, indegree = _successors_and_indegree(graph)
+
+        twins = _identical_twins(ops)
 
         results: list[Schedule] = []
 
-        # Backtracking to enumerate all topological sorts of the partial order
-        def backtrack(path: list[int], indeg: list[int], available: list[int]):
+        for path in _topological_orders(successors, indegree, twins):
+            # Operations are immutable and shared with the original schedule
+            results.append(Schedule(id=schedule.id, operations=_gather(ops, path)))
+
             # Early stop if we've reached the requested number of permutations
             if max_permutations is not None and len(results) >= max_permutations:
-                return
-
-            if len(path) == n:
-                perm_ops = [ops[i] for i in path]
-                # Create fresh Operation instances to avoid mutating originals
-                perm_ops_copied = [
-                    Operation(tx=o.tx, op=o.op, item=o.item) for o in perm_ops
-                ]
-                results.append(Schedule(id=schedule.id, operations=perm_ops_copied))
-                return
-
-            # Iterate over a snapshot of available nodes in deterministic order
-            for idx in sorted(available):
-                # Early stop check before choosing next
-                if max_permutations is not None and len(results) >= max_permutations:
-                    return
-
-                # Choose idx
-                path.append(idx)
-                new_available = available.copy()
-                new_available.remove(idx)
-                indeg_snapshot = indeg.copy()
-
-                # Decrease indegree of neighbors and add newly available nodes
-                for neigh in graph.adjacency[idx]:
-                    indeg_snapshot[neigh] -= 1
-                    if indeg_snapshot[neigh] == 0:
-                        new_available.append(neigh)
-
-                backtrack(path, indeg_snapshot, new_available)
-
-                # Backtrack
-                path.pop()
-
-                # Another early stop after backtracking
-                if max_permutations is not None and len(results) >= max_permutations:
-                    return
-
-        initial_available = [i for i in range(n) if indegree[i] == 0]
-        backtrack([], indegree, initial_available)
-        
+                break
+
         return results
     
     @classmethod
@@ -332,7 +645,8 @@ class ScheduleGenerator:
         cls,
         schedule: Schedule,
         count: int = 10,
-        max_attempts: Optional[int] = None
+        max_attempts: Optional[int] = None,
+        processes: Optional[int] = None
     ) -> list[Schedule]:
         """
         Generate random conflict-equivalent permutations efficiently.
@@ -345,7 +659,11 @@ class ScheduleGenerator:
             schedule: The original schedule to permute
             count: Number of random permutations to generate
             max_attempts: Maximum attempts to find unique permutations (default: count * 100)
-                         If None, will keep trying until count unique permutations are found
+                         If None, the remaining permutations are enumerated once
+                         sampling keeps returning duplicates
+            processes: If more than one, sample in this many worker processes when
+                       count is large enough to pay for starting them. Duplicates
+                       are still removed here, in the calling process.
         
         Returns:
             A list of up to 'count' unique random conflict-equivalent schedules
@@ -362,47 +680,74 @@ class ScheduleGenerator:
 
         # Build conflict graph
         graph = schedule.build_conflict_graph()
-        base_indegree = graph.get_in_degree()
         
         results: list[Schedule] = []
+
+        # Permutations are told apart by their operations, not their indices,
+        # so swapping two identical operations does not count as a new one.
+        # Identical operations share a small int id, so that a permutation key
+        # is a tuple of ints, hashed without hashing the operation fields.
+        canonical: dict[tuple, int] = {}
+        op_ids = [canonical.setdefault(op._key, len(canonical)) for op in ops]
         seen_permutations: set[tuple[int, ...]] = set()
         
+        # With the default attempt budget, a long run of duplicates means most
+        # distinct orders were found, and the rest are enumerated instead
+        enumerate_rest = max_attempts is None
         if max_attempts is None:
             max_attempts = count * 100
         
         attempts = 0
+        duplicates = 0
+
+        # Successors of each operation as tuples and indegrees, indexed by
+        # operation index, computed once for the sampler and the enumeration
+        successors, indegree = _successors_and_indegree(graph)
+        if processes is not None and processes > 1 and count >= _MIN_PARALLEL_COUNT:
+            batch_size = -(-count // processes)
+            sampler = _parallel_random_topological_orders(
+                successors, indegree, processes, batch_size)
+        else:
+            sampler = _random_topological_orders(successors, indegree)
         
-        while len(results) < count and attempts < max_attempts:
-            attempts += 1
+        try:
+            while len(results) < count and attempts < max_attempts:
+                attempts += 1
             
-            # Generate one random topological sort
-            indegree = base_indegree.copy()
-            available = [i for i in range(n) if indegree[i] == 0]
-            permutation = []
+                # Generate one random topological sort
+                permutation = next(sampler)
             
-            while available:
-                # Randomly choose from available nodes
-                idx = random.choice(available)
-                permutation.append(idx)
-                available.remove(idx)
+                # Check if this permutation is unique
+                perm_key = tuple([op_ids[i] for i in permutation])
+                if perm_key not in seen_permutations:
+                    seen_permutations.add(perm_key)
+                    duplicates = 0
                 
-                # Update indegrees and available nodes
-                for neighbor in graph.adjacency[idx]:
-                    indegree[neighbor] -= 1
-                    if indegree[neighbor] == 0:
-                        available.append(neighbor)
-            
-            # Check if this permutation is unique
-            perm_tuple = tuple(permutation)
-            if perm_tuple not in seen_permutations:
-                seen_permutations.add(perm_tuple)
-                
-                # Create the schedule from this permutation
-                perm_ops = [ops[i] for i in permutation]
-                perm_ops_copied = [
-                    Operation(tx=o.tx, op=o.op, item=o.item) for o in perm_ops
-                ]
-                results.append(Schedule(id=schedule.id, operations=perm_ops_copied))
+                    # Create the schedule from this permutation
+                    # Operations are immutable and shared with the original schedule
+                    results.append(Schedule(id=schedule.id, operations=_gather(ops, permutation)))
+                else:
+                    duplicates += 1
+                    if enumerate_rest and duplicates >= _MAX_DUPLICATE_SAMPLES:
+                        break
+        finally:
+            # Stop the worker processes, if any
+            sampler.close()
+
+        if enumerate_rest and len(results) < count and duplicates >= _MAX_DUPLICATE_SAMPLES:
+            # Take the distinct orders not sampled yet from the exhaustive
+            # enumeration, in random order
+            rest = []
+            twins = _identical_twins(ops)
+            for path in _topological_orders(successors, indegree, twins):
+                perm_key = tuple([op_ids[i] for i in path])
+                if perm_key not in seen_permutations:
+                    seen_permutations.add(perm_key)
+                    rest.append(Schedule(id=schedule.id, operations=_gather(ops, path)))
+                    if len(results) + len(rest) >= count:
+                        break
+            random.shuffle(rest)
+            results.extend(rest)
         
         return results
     
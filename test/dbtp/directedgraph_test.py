@@ -21,6 +21,67 @@ class DirectedGraphTest(unittest.TestCase):
         expected = "a -[A]-> b\nb -> c\n"
         self.assertEqual(res, expected)
 
+    def test_from_known_unique(self):
+        vertices = [Vertex(0, "a"), Vertex(1, "b"), Vertex(2, "c")]
+        edges = [Edge(0, 1), Edge(1, 2)]
+        g = DirectedGraph._from_known_unique(vertices, edges)
+        self.assertEqual(g.vertex_count(), 3)
+        self.assertEqual(g.edge_count(), 2)
+        self.assertTrue(g.has_edge(Edge(0, 1)))
+        self.assertEqual(g.topological_sort(), [0, 1, 2])
+        self.assertEqual(str(g), "a -> b\nb -> c\n")
+
+    def test_from_known_unique_dense(self):
+        vertices = [Vertex(0, "a"), Vertex(1, "b")]
+        g = DirectedGraph._from_known_unique(vertices, [Edge(0, 1)])
+        self.assertTrue(g._dense)
+        self.assertEqual(g.get_in_degree(), {0: 0, 1: 1})
+        self.assertEqual(g.get_out_degree(), {0: 1, 1: 0})
+
+        # Appending the next id keeps the graph dense
+        g.add_vertex(Vertex(2, "c"))
+        g.add_edge(Edge(1, 2))
+        self.assertTrue(g._dense)
+        self.assertEqual(g.topological_sort(), [0, 1, 2])
+
+        # Any other id switches to dict storage
+        g.add_vertex(Vertex(5, "f"))
+        self.assertFalse(g._dense)
+        g.add_edge(Edge(2, 5))
+        self.assertEqual(g.topological_sort(), [0, 1, 2, 5])
+        with self.assertRaises(ValueError):
+            g.add_vertex(Vertex(1, "b"))
+
+    def test_from_known_unique_dense_public_views(self):
+        vertices = [Vertex(0, "a"), Vertex(1, "b"), Vertex(2, "c")]
+        g = DirectedGraph._from_known_unique(vertices, [Edge(0, 1), Edge(0, 2)])
+
+        # The public attributes are mappings keyed by vertex id in any storage
+        self.assertEqual(g.vertices, {0: vertices[0], 1: vertices[1], 2: vertices[2]})
+        self.assertEqual(g.adjacency, {0: {1: None, 2: None}, 1: {}, 2: {}})
+        self.assertEqual(list(g.adjacency), [0, 1, 2])
+        self.assertIn(2, g.vertices)
+        self.assertNotIn(-1, g.vertices)
+        with self.assertRaises(KeyError):
+            g.vertices[-1]
+
+        # Reading them leaves the dense storage in place
+        self.assertTrue(g._dense)
+
+        # The views are read-only and follow later edits
+        with self.assertRaises(TypeError):
+            g.vertices[3] = Vertex(3, "d")
+        view = g.adjacency
+        g.add_vertex(Vertex(3, "d"))
+        g.add_edge(Edge(2, 3))
+        self.assertEqual(view[2], {3: None})
+        self.assertEqual(g.topological_sort(), [0, 1, 2, 3])
+
+        g.add_vertex(Vertex(5, "f"))
+        self.assertEqual(list(g.vertices), [0, 1, 2, 3, 5])
+        with self.assertRaises(TypeError):
+            g.adjacency[6] = {}
+
     def test_add_vertex_and_vertex_count(self):
         g = DirectedGraph()
         a = Vertex(0, "a")
@@ -36,7 +97,73 @@ class DirectedGraphTest(unittest.TestCase):
         g.add_edge(e)
         self.assertEqual(g.vertex_count(), 2)
         self.assertEqual(g.edge_count(), 1)
-        self.assertEqual(g.adjacency[a.id], [b.id])
+        self.assertEqual(list(g.adjacency[a.id]), [b.id])
+
+    def test_add_edges(self):
+        g = DirectedGraph()
+        for v in (Vertex(0, "a"), Vertex(1, "b"), Vertex(2, "c")):
+            g.add_vertex(v)
+        g.add_edges([Edge(0, 1), Edge(1, 2), Edge(2, 0)])
+        self.assertEqual(g.edge_count(), 3)
+        self.assertEqual(list(g.adjacency[2]), [0])
+        with self.assertRaises(ValueError):
+            g.add_edges([Edge(0, 2), Edge(0, 1)])
+        with self.assertRaises(ValueError):
+            g.add_edges([Edge(0, 3)])
+        with self.assertRaises(ValueError):
+            g.add_edges([Edge(1, 0), Edge(1, 0)])
+        # Rejected batches leave the graph unchanged
+        self.assertEqual(g.edge_count(), 3)
+        self.assertFalse(g.has_edge(Edge(0, 2)))
+
+    def test_add_edges_failed_batch_keeps_topological_order(self):
+        g = DirectedGraph()
+        for v in (Vertex(0, "a"), Vertex(1, "b"), Vertex(2, "c")):
+            g.add_vertex(v)
+        g.add_edge(Edge(1, 2))
+        self.assertEqual(g.topological_sort(), [0, 1, 2])
+        with self.assertRaises(ValueError):
+            g.add_edges([Edge(2, 0), Edge(1, 2)])
+        self.assertFalse(g.has_edge(Edge(2, 0)))
+        self.assertEqual(g.topological_sort(), [0, 1, 2])
+        g.add_edges([Edge(2, 0)])
+        self.assertEqual(g.topological_sort(), [1, 2, 0])
+
+    def test_negative_and_large_ids(self):
+        g = DirectedGraph()
+        for vid in (-1, 0, 1, 2, 1 << 32):
+            g.add_vertex(Vertex(vid))
+        g.add_edge(Edge(1, -1))
+        g.add_edge(Edge(2, -1))
+        g.add_edge(Edge(0, 1 << 32))
+        self.assertEqual(g.edge_count(), 3)
+        self.assertTrue(g.has_edge(Edge(2, -1)))
+        self.assertFalse(g.has_edge(Edge(1, 0)))
+        self.assertEqual(g.topological_sort(), [0, 1, 2, -1, 1 << 32])
+
+    def test_has_edge_and_get_edge(self):
+        g = DirectedGraph()
+        a, b = Vertex(0, "a"), Vertex(1, "b")
+        g.add_vertex(a)
+        g.add_vertex(b)
+        e = Edge(a.id, b.id, "ab")
+        g.add_edge(e)
+        self.assertTrue(g.has_edge(Edge(a.id, b.id)))
+        self.assertFalse(g.has_edge(Edge(b.id, a.id)))
+        self.assertIs(g.get_edge(a.id, b.id), e)
+
+    def test_remove_edge(self):
+        g = DirectedGraph()
+        a, b, c = Vertex(0, "a"), Vertex(1, "b"), Vertex(2, "c")
+        for v in (a, b, c):
+            g.add_vertex(v)
+        g.add_edge(Edge(a.id, b.id))
+        g.add_edge(Edge(a.id, c.id))
+        g.remove_edge(Edge(a.id, b.id))
+        self.assertEqual(g.edge_count(), 1)
+        self.assertEqual(list(g.adjacency[a.id]), [c.id])
+        with self.assertRaises(ValueError):
+            g.remove_edge(Edge(a.id, b.id))
 
     def test_get_out_degree(self):
         g = DirectedGraph()
@@ -94,3 +221,43 @@ class DirectedGraphTest(unittest.TestCase):
         g.add_edge(Edge(c.id, a.id))
         with self.assertRaises(CyclicGraphError):
             g.topological_sort()
+
+    def test_topological_sort_cached(self):
+        g = DirectedGraph()
+        a, b, c = Vertex(0, "a"), Vertex(1, "b"), Vertex(2, "c")
+        for v in (a, b, c):
+            g.add_vertex(v)
+        g.add_edge(Edge(b.id, a.id))
+        topo = g.topological_sort()
+        self.assertEqual(topo, [b.id, a.id, c.id])
+
+        # Changing the returned list does not affect the cached order
+        topo.reverse()
+        self.assertEqual(g.topological_sort(), [b.id, a.id, c.id])
+
+        # Edits invalidate the cached order
+        g.add_edge(Edge(c.id, b.id))
+        self.assertEqual(g.topological_sort(), [c.id, b.id, a.id])
+        g.add_edge(Edge(a.id, c.id))
+        with self.assertRaises(CyclicGraphError):
+            g.topological_sort()
+        with self.assertRaises(CyclicGraphError):
+            g.topological_sort()
+        g.remove_edge(Edge(a.id, c.id))
+        self.assertEqual(g.topological_sort(), [c.id, b.id, a.id])
+
+        # An edge removed by hand from edges and adjacency is noticed too
+        del g.edges[(c.id, b.id)]
+        del g.adjacency[c.id][b.id]
+        self.assertEqual(g.topological_sort(), [b.id, a.id, c.id])
+
+    def test_is_acyclic(self):
+        g = DirectedGraph()
+        a, b, c = Vertex(0, "a"), Vertex(1, "b"), Vertex(2, "c")
+        for v in (a, b, c):
+            g.add_vertex(v)
+        g.add_edge(Edge(a.id, b.id))
+        g.add_edge(Edge(b.id, c.id))
+        self.assertTrue(g.is_acyclic())
+        g.add_edge(Edge(c.id, a.id))
+        self.assertFalse(g.is_acyclic())
@@ -1,4 +1,5 @@
 import unittest
+from dataclasses import FrozenInstanceError
 
 from dbtp.operation import Operation, OperationType
 
@@ -58,5 +59,24 @@ class OperationTest(unittest.TestCase):
                 self.assertEqual(parsed_op.op, expected_op.op)
                 self.assertEqual(parsed_op.item, expected_op.item)
 
+    def test_parse_negative_tx(self):
+        for input_str in ["R_-1(A)", "W_-2(B)", "COMMIT_-1", "ROLLBACK_-3"]:
+            with self.subTest(input_str=input_str):
+                op = Operation.parse(input_str)
+                self.assertLess(op.tx, 0)
+                self.assertEqual(str(op), input_str)
+
+    def test_parse_invalid(self):
+        for input_str in ["", "R_1", "Q_1(A)", "R_x(A)", "COMMIT_", "R_1(A"]:
+            with self.subTest(input_str=input_str):
+                with self.assertRaises(ValueError):
+                    Operation.parse(input_str)
+
+    def test_immutable(self):
+        op = Operation(tx=1, op=OperationType.READ, item="A")
+        with self.assertRaises(FrozenInstanceError):
+            op.item = "B"
+        self.assertEqual(hash(op), hash(Operation(tx=1, op=OperationType.READ, item="A")))
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
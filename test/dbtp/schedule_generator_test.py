@@ -9,6 +9,7 @@ from dbtp import (
     ScheduleGenerator,
     Schedule
 )
+from dbtp.schedule_generator import _IncrementalTopologicalOrder, _ReachabilityClosure
 
 class ScheduleGeneratorTest(unittest.TestCase):
     
@@ -45,6 +46,41 @@ class ScheduleGeneratorTest(unittest.TestCase):
         with self.assertRaises(CyclicGraphError):
             topo_order = graph.topological_sort()
 
+    def test_generate_random_dense_precedence_graph(self):
+        # A complete DAG on 6 vertices has 15 edges
+        graph = ScheduleGenerator.generate_random_precedence_graph(
+            transaction_count = 6,
+            edge_count = 15
+        )
+        self.assertEqual(len(graph.edges), 15)
+        self.assertTrue(graph.is_acyclic())
+
+    def test_incremental_topological_order(self):
+        graph = DirectedGraph(vertices=[Vertex(id=i) for i in range(1, 5)])
+        order = _IncrementalTopologicalOrder(graph)
+        # Edges against the initial order 1, 2, 3, 4 move vertices around
+        self.assertTrue(order.try_add_edge(4, 3))
+        self.assertTrue(order.try_add_edge(3, 1))
+        self.assertTrue(order.try_add_edge(1, 2))
+        # 2 is reachable from 4, so 2 -> 4 closes a cycle
+        self.assertFalse(order.try_add_edge(2, 4))
+        self.assertEqual(graph.edge_count(), 3)
+        for e in graph.edges.values():
+            self.assertLess(order.order[e.source], order.order[e.target])
+
+    def test_reachability_closure(self):
+        graph = DirectedGraph(vertices=[Vertex(id=i) for i in range(1, 5)])
+        graph.add_edge(Edge(source=4, target=3))
+        closure = _ReachabilityClosure(graph)
+        self.assertTrue(closure.try_add_edge(3, 1))
+        self.assertTrue(closure.try_add_edge(1, 2))
+        # 2 is reachable from 4, so 2 -> 4 closes a cycle
+        self.assertFalse(closure.try_add_edge(2, 4))
+        self.assertFalse(closure.try_add_edge(2, 3))
+        self.assertTrue(closure.try_add_edge(4, 2))
+        self.assertEqual(graph.edge_count(), 4)
+        self.assertTrue(graph.is_acyclic())
+
     def test_simple_two_transaction_chain(self):
         """Test T1 -> T2 precedence"""
         vertices = [
@@ -205,6 +241,12 @@ class ScheduleGeneratorTest(unittest.TestCase):
         for i in range(5):
             self.assertTrue(schedule.is_conflict_equivalent_with(permutations[i]))
 
+        # Permutations that only swap identical operations are not distinct
+        schedule = Schedule.parse("S_1 : R_1(A), R_1(A), R_2(A), W_3(B), W_3(B)")
+        permutations = ScheduleGenerator.generate_conflict_equivalent_permutations(schedule)
+        self.assertEqual(len(set(str(p) for p in permutations)), 30)
+        self.assertEqual(len(permutations), 30)
+
     def test_generate_random_conflict_equivalent_permutations(self):
         schedule = Schedule.parse("S_1 : W_1(A), W_1(B), R_2(A), W_2(C), R_3(B), W_3(D), R_4(C), R_4(D)")
         permutations = ScheduleGenerator.generate_random_conflict_equivalent_permutations(
@@ -215,6 +257,23 @@ class ScheduleGeneratorTest(unittest.TestCase):
 
         for i in range(10):
             self.assertTrue(schedule.is_conflict_equivalent_with(permutations[i]))
+
+        # Asking for more permutations than there are returns all of them
+        permutations = ScheduleGenerator.generate_random_conflict_equivalent_permutations(
+            schedule,
+            count = 3000
+        )
+        self.assertEqual(len(set(str(p) for p in permutations)), 2520)
+
+        # Sampling in worker processes gives the same kind of result
+        permutations = ScheduleGenerator.generate_random_conflict_equivalent_permutations(
+            schedule,
+            count = 100,
+            processes = 2
+        )
+        self.assertEqual(len(set(str(p) for p in permutations)), 100)
+        for p in permutations:
+            self.assertTrue(schedule.is_conflict_equivalent_with(p))
         
         schedule = Schedule.parse("S_1 : R_1(A), W_1(A), R_1(B), W_1(B), R_2(A), W_2(A), R_2(C), W_2(C), R_3(B), W_3(B), R_3(D), W_3(D), R_4(C), R_4(D), W_4(C), W_4(D)")
         permutations = ScheduleGenerator.generate_random_conflict_equivalent_permutations(
@@ -226,5 +285,14 @@ class ScheduleGeneratorTest(unittest.TestCase):
         for i in range(20):
             self.assertTrue(schedule.is_conflict_equivalent_with(permutations[i]))
 
+        # Permutations that only swap identical operations are not distinct
+        schedule = Schedule.parse("S_1 : R_1(A), R_1(A), R_2(A)")
+        permutations = ScheduleGenerator.generate_random_conflict_equivalent_permutations(
+            schedule,
+            count = 10
+        )
+        self.assertEqual(len(set(str(p) for p in permutations)), 3)
+        self.assertEqual(len(permutations), 3)
+
 if __name__ == "__main__":
     unittest.main()
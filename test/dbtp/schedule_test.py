@@ -1,7 +1,8 @@
 import unittest
+import pickle
 
 from dbtp import Schedule, Operation, OperationType
-from dbtp.directedgraph import DirectedGraph, CyclicGraphError
+from dbtp.directedgraph import DirectedGraph, Vertex, Edge, CyclicGraphError
 
 class TestSchedule(unittest.TestCase):
     def test_str(self):
@@ -47,6 +48,42 @@ class TestSchedule(unittest.TestCase):
         self.assertEqual(schedule.operations[2].op, OperationType.COMMIT)
         self.assertIsNone(schedule.operations[2].item)
 
+    def test_parse_returns_new_schedule(self):
+        s = "S_4 : R_1(A), W_2(A)"
+        schedule1 = Schedule.parse(s)
+        schedule2 = Schedule.parse(s)
+        self.assertIsNot(schedule1, schedule2)
+        self.assertEqual(str(schedule1), str(schedule2))
+
+        schedule1.id = 5
+        schedule1.operations.append(Operation(tx=1, op=OperationType.COMMIT))
+        self.assertEqual(str(schedule2), s)
+
+    def test_pickle(self):
+        schedule = Schedule.parse("S_1 : R_1(A), W_2(A), COMMIT_1")
+        schedule.build_conflict_graph()
+        copy = pickle.loads(pickle.dumps(schedule))
+        self.assertEqual(str(copy), str(schedule))
+        self.assertIsNone(copy._conflict_graph)
+
+    def test_parse_negative_tx(self):
+        s = "S_1 : W_1(A), R_-1(A), W_2(B), R_-1(B), COMMIT_-1"
+        schedule = Schedule.parse(s)
+        self.assertEqual(schedule.operations[1].tx, -1)
+        self.assertEqual(str(schedule), s)
+
+        # Edges into a negative transaction are kept apart
+        graph = schedule.build_precedence_graph()
+        self.assertEqual(graph.edge_count(), 2)
+        self.assertTrue(graph.has_edge(Edge(1, -1)))
+        self.assertTrue(graph.has_edge(Edge(2, -1)))
+
+    def test_parse_invalid(self):
+        with self.assertRaises(ValueError):
+            Schedule.parse("T_1 : R_1(A)")
+        with self.assertRaises(ValueError):
+            Schedule.parse("S_1 R_1(A)")
+
     def test_parse_locks(self):
         s = "S_3 : SL_1(A), XL_2(B), U_1(A), L_1(C)"
         schedule = Schedule.parse(s)
@@ -84,6 +121,33 @@ class TestSchedule(unittest.TestCase):
         
         self.assertEqual(actual_edges, expected_edges)
 
+    def test_build_conflict_graph_edge_order(self):
+        # Edges are listed in operation index order, not grouped by item
+        schedule = Schedule.parse("S_1 : W_1(A), W_2(B), W_3(A), R_4(B), R_4(A)")
+        graph = schedule.build_conflict_graph()
+        self.assertEqual(list(graph.edges), [(0, 2), (0, 4), (1, 3), (2, 4)])
+        self.assertEqual(str(graph), "W_1(A) -> W_3(A)\nW_1(A) -> R_4(A)\nW_2(B) -> R_4(B)\nW_3(A) -> R_4(A)\n")
+
+    def test_build_conflict_graph_end_operations(self):
+        # COMMIT and ROLLBACK of different transactions conflict, like
+        # Operation.is_in_conflict_with says
+        schedule = Schedule.parse("S_1 : W_1(A), R_2(A), COMMIT_2, ROLLBACK_1")
+        graph = schedule.build_conflict_graph()
+        self.assertEqual(list(graph.edges), [(0, 1), (2, 3)])
+        self.assertTrue(schedule.operations[2].is_in_conflict_with(schedule.operations[3]))
+        self.assertFalse(schedule.is_conflict_serializable())
+
+    def test_build_conflict_graph_cached(self):
+        schedule = Schedule.parse("S_1 : R_1(A), W_2(A), W_1(B), R_2(B)")
+        graph = schedule.build_conflict_graph()
+        self.assertIs(schedule.build_conflict_graph(), graph)
+
+        schedule.operations.append(Operation(tx=3, op=OperationType.WRITE, item="A"))
+        schedule._invalidate_cache()
+        graph = schedule.build_conflict_graph()
+        self.assertEqual(graph.vertex_count(), 5)
+        self.assertEqual(graph.edge_count(), 4)
+
     def test_is_conflict_equivalent_with(self):
         schedule1 = Schedule.parse("S_1 : R_1(A), W_2(A)")
         schedule2 = Schedule.parse("S_2 : W_2(A), R_1(A)")
@@ -92,6 +156,30 @@ class TestSchedule(unittest.TestCase):
         schedule3 = Schedule.parse("S_3 : R_1(A), W_2(A)")
         self.assertTrue(schedule1.is_conflict_equivalent_with(schedule3))
 
+        # Same set of operations but different multiplicities
+        schedule4 = Schedule.parse("S_4 : R_1(A), R_1(A), W_2(B)")
+        schedule5 = Schedule.parse("S_5 : R_1(A), W_2(B), W_2(B)")
+        self.assertFalse(schedule4.is_conflict_equivalent_with(schedule5))
+
+    def test_are_conflict_graphs_isomorphic(self):
+        schedule = Schedule.parse("S_1 : R_1(A), W_2(A)")
+        graph = schedule.build_conflict_graph()
+        self.assertTrue(schedule.are_conflict_graphs_isomorphic(
+            graph, Schedule.parse("S_2 : R_1(A), W_2(A)").build_conflict_graph()))
+        self.assertFalse(schedule.are_conflict_graphs_isomorphic(
+            graph, Schedule.parse("S_2 : W_2(A), R_1(A)").build_conflict_graph()))
+
+        # Labels other than operations are compared by their string form
+        labeled = DirectedGraph(
+            vertices=[Vertex(0, "R_1(A)"), Vertex(1, "W_2(A)")],
+            edges=[Edge(0, 1)]
+        )
+        self.assertTrue(schedule.are_conflict_graphs_isomorphic(graph, labeled))
+        self.assertTrue(schedule.are_conflict_graphs_isomorphic(labeled, labeled))
+        self.assertFalse(schedule.are_conflict_graphs_isomorphic(labeled, DirectedGraph(
+            vertices=[Vertex(0, "R_1(A)"), Vertex(1, "W_2(A)")]
+        )))
+
     def test_build_precedence_graph(self):
         schedule = Schedule.parse("S_1 : R_1(A), W_2(A), W_1(B), R_2(B)")
         graph = schedule.build_precedence_graph()
@@ -109,6 +197,14 @@ class TestSchedule(unittest.TestCase):
 
         self.assertEqual(actual_edges, expected_edges)
 
+    def test_build_precedence_graph_edge_order(self):
+        # Transaction pairs are added in the order their first conflict is
+        # found by operation index, not grouped by item
+        schedule = Schedule.parse("S_1 : W_1(A), W_2(B), W_3(A), R_4(B), R_4(A)")
+        graph = schedule.build_precedence_graph()
+        self.assertEqual(list(graph.edges), [(1, 3), (1, 4), (2, 4), (3, 4)])
+        self.assertEqual(str(graph), "1 -> 3\n1 -> 4\n2 -> 4\n3 -> 4\n")
+
     def test_is_conflict_serializable(self):
         # Non-serializable: cyclic dependency T1 -> T2 -> T1
         schedule1 = Schedule.parse("S_1 : R_1(A), W_2(A), R_2(B), W_1(B)")
@@ -118,6 +214,10 @@ class TestSchedule(unittest.TestCase):
         schedule2 = Schedule.parse("S_2 : R_1(A), W_1(A), R_2(A), W_2(B)")
         self.assertTrue(schedule2.is_conflict_serializable())
 
+        # Non-serializable: T1 -> T2 -> T3 -> T1, although T1 and T2 do not overlap
+        schedule3 = Schedule.parse("S_3 : W_3(C), R_1(C), W_1(A), R_2(A), W_2(B), R_3(B)")
+        self.assertFalse(schedule3.is_conflict_serializable())
+
     def test_serialize(self):
         schedule = Schedule.parse("S_1 : R_1(A), W_2(A), W_1(B), R_2(B)")
         serial = schedule.serialize()
@@ -146,6 +246,15 @@ class TestSchedule(unittest.TestCase):
 
         self.assertEqual(actual_edges, expected_edges)
 
+    def test_build_wait_for_graph_repeated_wait(self):
+        # T2 waits for T1 on both A and B, the edge is added once
+        schedule = Schedule.parse(
+            "S_1 : SL_1(A), SL_1(B), XL_2(A), XL_2(B)"
+        )
+        graph = schedule.build_wait_for_graph()
+        actual_edges = set((edge.source, edge.target) for edge in graph.edges.values())
+        self.assertEqual(actual_edges, { (2, 1) })
+
     def test_build_wait_for_graph_deadlock(self):
         schedule = Schedule.parse(
             "S_1 : XL_1(A), XL_2(B), XL_1(B), XL_2(A)"
@@ -203,6 +312,12 @@ class TestSchedule(unittest.TestCase):
         )
         self.assertFalse(schedule2.is_two_phase_locked())
 
+        # Interleaved transactions, only T2 locks after unlocking
+        schedule3 = Schedule.parse(
+            "S_3 : XL_1(A), XL_2(B), U_2(B), W_1(A), U_1(A), XL_2(A), W_2(A), U_2(A)"
+        )
+        self.assertFalse(schedule3.is_two_phase_locked())
+
     def test_add_locks_to_schedule(self):
         schedule = Schedule.parse("S_1 : R_1(A), W_1(B), W_1(A)")
 
@@ -217,6 +332,12 @@ class TestSchedule(unittest.TestCase):
         expected = "S_1 : SL_1(A), R_1(A), XL_1(B), W_1(B), U_1(B), XL_1(A), W_1(A), U_1(A)"
         self.assertEqual(str(locked), expected)
 
+        # COMMIT and ROLLBACK are kept in place
+        schedule = Schedule.parse("S_1 : R_1(A), W_2(A), COMMIT_1, ROLLBACK_2")
+        locked = schedule.add_locks()
+        expected = "S_1 : L_1(A), R_1(A), U_1(A), L_2(A), W_2(A), U_2(A), COMMIT_1, ROLLBACK_2"
+        self.assertEqual(str(locked), expected)
+
     def test_add_locks_to_schedule_two_phase(self):
         schedule = Schedule.parse("S_1 : R_1(A), W_1(B), W_1(A)")
 
@@ -231,4 +352,34 @@ class TestSchedule(unittest.TestCase):
         schedule = Schedule.parse("S_1 : R_1(A), W_1(B), R_2(B), W_1(A), W_2(B)")
         locked = schedule.add_locks_two_phase(use_shared_locks=True)
         expected = "S_1 : SL_1(A), R_1(A), XL_1(B), W_1(B), SL_2(B), R_2(B), XL_1(A), U_1(B), W_1(A), U_1(A), XL_2(B), W_2(B), U_2(B)"
-        self.assertEqual(str(locked), expected)
\ No newline at end of file
+        self.assertEqual(str(locked), expected)
+
+        # COMMIT and ROLLBACK release the remaining locks of several transactions sharing items
+        schedule = Schedule.parse("S_1 : R_1(A), W_2(A), R_1(B), COMMIT_1, W_2(B), ROLLBACK_2")
+        locked = schedule.add_locks_two_phase()
+        expected = "S_1 : L_1(A), R_1(A), L_2(A), W_2(A), L_1(B), U_1(A), R_1(B), U_1(B), COMMIT_1, L_2(B), U_2(A), W_2(B), U_2(B), ROLLBACK_2"
+        self.assertEqual(str(locked), expected)
+
+        schedule = Schedule.parse("S_1 : R_1(A), R_2(A), W_1(B), COMMIT_1, W_2(A), COMMIT_2")
+        locked = schedule.add_locks_two_phase(use_shared_locks=True)
+        expected = "S_1 : SL_1(A), R_1(A), SL_2(A), R_2(A), XL_1(B), U_1(A), W_1(B), U_1(B), COMMIT_1, XL_2(A), W_2(A), U_2(A), COMMIT_2"
+        self.assertEqual(str(locked), expected)
+        self.assertTrue(locked.is_two_phase_locked())
+
+        # Accesses after the end of a transaction lock again, so the result
+        # is no longer two-phase locked
+        schedule = Schedule.parse("S_1 : R_1(A), COMMIT_1, R_1(A)")
+        locked = schedule.add_locks_two_phase()
+        expected = "S_1 : L_1(A), R_1(A), U_1(A), COMMIT_1, L_1(A), R_1(A), U_1(A)"
+        self.assertEqual(str(locked), expected)
+
+        locked = schedule.add_locks_two_phase(use_shared_locks=True)
+        expected = "S_1 : SL_1(A), R_1(A), U_1(A), COMMIT_1, SL_1(A), R_1(A), U_1(A)"
+        self.assertEqual(str(locked), expected)
+        self.assertFalse(locked.is_two_phase_locked())
+
+        schedule = Schedule.parse("S_1 : R_1(A), W_1(B), ROLLBACK_1, W_1(A), R_2(A), COMMIT_2")
+        locked = schedule.add_locks_two_phase(use_shared_locks=True)
+        expected = "S_1 : SL_1(A), R_1(A), XL_1(B), U_1(A), W_1(B), U_1(B), ROLLBACK_1, XL_1(A), W_1(A), U_1(A), SL_2(A), R_2(A), U_2(A), COMMIT_2"
+        self.assertEqual(str(locked), expected)
+        self.assertFalse(locked.is_two_phase_locked())
\ No newline at end of file